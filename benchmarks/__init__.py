@@ -0,0 +1,3 @@
+from .backends import SyntheticBackend, synthetic_properties
+from .circuits import benchmark_circuit
+from .routing import run_benchmark, run_benchmarks, compare, success_probability
@@ -0,0 +1,168 @@
+import datetime
+
+import numpy as np
+
+from qiskit.providers.models import BackendProperties
+from qiskit.transpiler import CouplingMap
+
+
+def line(num_qubits):
+    """
+    Args:
+        num_qubits (int): number of qubits.
+
+    Returns:
+        list: edges of a line of qubits.
+    """
+    return [[i, i + 1] for i in range(num_qubits - 1)]
+
+
+def ring(num_qubits):
+    """
+    Args:
+        num_qubits (int): number of qubits.
+
+    Returns:
+        list: edges of a ring of qubits.
+    """
+    return line(num_qubits) + [[num_qubits - 1, 0]]
+
+
+def grid(rows, cols):
+    """
+    Args:
+        rows (int): number of rows.
+        cols (int): number of columns.
+
+    Returns:
+        list: edges of a grid of qubits, numbered row by row.
+    """
+    edges = []
+    for r in range(rows):
+        for c in range(cols):
+            q = r * cols + c
+            if c + 1 < cols:
+                edges.append([q, q + 1])
+            if r + 1 < rows:
+                edges.append([q, q + cols])
+    return edges
+
+
+def heavy_hex(rows, cols):
+    """Heavy-hex lattice as in IBM devices: rows of `cols` qubits in a line,
+    consecutive rows are linked by bridge qubits every four columns,
+    starting from column 0 below even rows and from column 2 below odd rows.
+
+    Args:
+        rows (int): number of rows.
+        cols (int): number of qubits in a row.
+
+    Returns:
+        list: edges of the lattice, row qubits are numbered first, then bridge qubits.
+    """
+    edges = []
+    for r in range(rows):
+        edges.extend([r * cols + c, r * cols + c + 1] for c in range(cols - 1))
+    bridge = rows * cols
+    for r in range(rows - 1):
+        for c in range(0 if r % 2 == 0 else 2, cols, 4):
+            edges.append([r * cols + c, bridge])
+            edges.append([bridge, (r + 1) * cols + c])
+            bridge += 1
+    return edges
+
+
+TOPOLOGIES = {
+    'line': line,
+    'ring': ring,
+    'grid': grid,
+    'heavy_hex': heavy_hex
+}
+
+
+class SyntheticBackend:
+    """
+    Offline backend made of a synthetic coupling map and generated calibration data.
+
+    Backends are described by a name such as ``line-5``, ``ring-16``, ``grid-4x4`` or
+    ``heavy_hex-3x7``, the topology followed by its dimensions.
+    """
+
+    def __init__(self, name, seed=1234):
+        """SyntheticBackend initializer.
+
+        Args:
+            name (str): topology and dimensions of the coupling map.
+            seed (int): seed of the generated calibration data.
+        Raises:
+            ValueError: if the topology is unknown.
+        """
+        self.name = name
+        topology, _, dims = name.partition('-')
+        if topology not in TOPOLOGIES or not dims:
+            raise ValueError('Unknown synthetic backend %s' % name)
+        edges = TOPOLOGIES[topology](*[int(d) for d in dims.split('x')])
+        # cnots can be applied in both directions, as on IBM devices
+        self.coupling_map = CouplingMap(edges + [[j, i] for i, j in edges])
+        self.properties = synthetic_properties(self.coupling_map, name, seed)
+
+    def num_qubits(self):
+        return self.coupling_map.size()
+
+
+def synthetic_properties(coupling_map, name='synthetic', seed=1234):
+    """Generates calibration data with error rates and coherence times
+    in the range of current superconducting devices.
+
+    Args:
+        coupling_map (CouplingMap): the device coupling map.
+        name (str): backend name.
+        seed (int): random seed.
+
+    Returns:
+        BackendProperties: the generated calibration data.
+    """
+    rng = np.random.RandomState(seed)
+    date = datetime.datetime(2020, 1, 1)
+    num_qubits = coupling_map.size()
+
+    def nduv(param, unit, value):
+        return {'date': date, 'name': param, 'unit': unit, 'value': float(value)}
+
+    qubits = []
+    for _ in range(num_qubits):
+        t1 = rng.uniform(50, 150)
+        qubits.append([
+            nduv('T1', 'µs', t1),
+            nduv('T2', 'µs', rng.uniform(0.5, 1.5) * t1),
+            nduv('frequency', 'GHz', rng.uniform(4.8, 5.3)),
+            nduv('readout_error', '', rng.uniform(0.01, 0.05))
+        ])
+
+    gates = []
+    for q in range(num_qubits):
+        sq_error = rng.uniform(1e-4, 1e-3)
+        gates.append({'gate': 'id', 'qubits': [q], 'name': 'id_%d' % q,
+                      'parameters': [nduv('gate_error', '', sq_error), nduv('gate_length', 'ns', 35.5)]})
+        gates.append({'gate': 'u1', 'qubits': [q], 'name': 'u1_%d' % q,
+                      'parameters': [nduv('gate_error', '', 0.0), nduv('gate_length', 'ns', 0.0)]})
+        gates.append({'gate': 'u2', 'qubits': [q], 'name': 'u2_%d' % q,
+                      'parameters': [nduv('gate_error', '', sq_error), nduv('gate_length', 'ns', 35.5)]})
+        gates.append({'gate': 'u3', 'qubits': [q], 'name': 'u3_%d' % q,
+                      'parameters': [nduv('gate_error', '', 2 * sq_error), nduv('gate_length', 'ns', 71.1)]})
+    edges = sorted({tuple(sorted(edge)) for edge in coupling_map.get_edges()})
+    for i, j in edges:
+        cx_error = rng.uniform(0.005, 0.03)
+        cx_length = rng.uniform(250, 550)
+        for a, b in ((i, j), (j, i)):
+            gates.append({'gate': 'cx', 'qubits': [a, b], 'name': 'cx%d_%d' % (a, b),
+                          'parameters': [nduv('gate_error', '', cx_error), nduv('gate_length', 'ns', cx_length)]})
+
+    return BackendProperties.from_dict({
+        'backend_name': name,
+        'backend_version': '0.0.0',
+        'last_update_date': date,
+        'qubits': qubits,
+        'gates': gates,
+        'general': []
+    })
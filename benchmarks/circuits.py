@@ -0,0 +1,105 @@
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import QFT
+from qiskit.circuit.random import random_circuit
+
+
+def ghz(num_qubits):
+    """
+    Args:
+        num_qubits (int): number of qubits.
+
+    Returns:
+        QuantumCircuit: GHZ state preparation followed by measurements.
+    """
+    qc = QuantumCircuit(num_qubits)
+    qc.h(0)
+    for i in range(num_qubits - 1):
+        qc.cx(i, i + 1)
+    qc.measure_all()
+    return qc
+
+
+def qft(num_qubits):
+    """
+    Args:
+        num_qubits (int): number of qubits.
+
+    Returns:
+        QuantumCircuit: quantum Fourier transform followed by measurements.
+    """
+    qc = QuantumCircuit(num_qubits)
+    qc.h(range(num_qubits))
+    qc.append(QFT(num_qubits), range(num_qubits))
+    qc.measure_all()
+    return qc.decompose()
+
+
+def random_gates(num_qubits, depth=None, seed=1234):
+    """
+    Args:
+        num_qubits (int): number of qubits.
+        depth (int): depth of the circuit, defaults to the number of qubits.
+        seed (int): random seed.
+
+    Returns:
+        QuantumCircuit: random circuit of one and two-qubit gates followed by measurements.
+    """
+    if depth is None:
+        depth = num_qubits
+    qc = random_circuit(num_qubits, depth, max_operands=2, seed=seed)
+    qc.measure_all()
+    return qc
+
+
+def cascade(num_qubits, reps=3):
+    """Circuit made of inverse cnot cascades, i.e. cnots with a common control and increasingly
+    distant targets, each followed by a cnot cascade, i.e. cnots with a common target and
+    increasingly close controls, as in TransformCxCascade and as found in chemistry ansatzes.
+
+    Args:
+        num_qubits (int): number of qubits.
+        reps (int): number of cascade and inverse cascade pairs.
+
+    Returns:
+        QuantumCircuit: the circuit followed by measurements.
+    """
+    qc = QuantumCircuit(num_qubits)
+    for r in range(reps):
+        qc.h(range(num_qubits))
+        for i in range(1, num_qubits):
+            qc.cx(0, i)
+        qc.rz(0.1 * (r + 1), range(num_qubits))
+        for i in range(num_qubits - 1, 0, -1):
+            qc.cx(i, 0)
+    qc.measure_all()
+    return qc
+
+
+WORKLOADS = {
+    'ghz': ghz,
+    'qft': qft,
+    'random': random_gates,
+    'cascade': cascade
+}
+
+
+def benchmark_circuit(name, seed=1234):
+    """
+    Args:
+        name (str): workload and number of qubits, such as ``qft-8``.
+        seed (int): random seed, used by random circuits.
+
+    Returns:
+        QuantumCircuit: the benchmark circuit.
+    Raises:
+        ValueError: if the workload is unknown.
+    """
+    workload, _, num_qubits = name.partition('-')
+    if workload not in WORKLOADS or not num_qubits:
+        raise ValueError('Unknown benchmark circuit %s' % name)
+    if workload == 'random':
+        qc = random_gates(int(num_qubits), seed=seed)
+    else:
+        qc = WORKLOADS[workload](int(num_qubits))
+    qc.name = name
+    return qc
@@ -0,0 +1,320 @@
+"""
+Routing benchmarks of ChainLayout, TransformCxCascade and NoiseAdaptiveSwap
+on synthetic backends, which run offline.
+
+Every pass runs on every backend and circuit, NoiseAdaptiveSwap with every combination
+of the given parameters. Each run takes place in a child process, to measure its peak
+memory and to stop it after a timeout. Results can be saved as a baseline, and later
+runs compared against it to find regressions.
+
+Examples:
+    python -m benchmarks.routing --backends grid-4x4 heavy_hex-3x7 --circuits qft-8 cascade-8 \\
+        --search-depth 3 4 --front false true --save-baseline baseline.json
+    python -m benchmarks.routing --compare baseline.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from qiskit import transpile
+from qiskit.converters import circuit_to_dag
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import TrivialLayout, FullAncillaAllocation, EnlargeWithAncilla, ApplyLayout
+
+from metrics import expected_fidelity
+from passes import ChainLayout, NoiseAdaptiveSwap, TransformCxCascade
+
+from .backends import SyntheticBackend
+from .circuits import benchmark_circuit
+
+BASIS_GATES = ['u1', 'u2', 'u3', 'cx', 'id']
+
+DEFAULT_BACKENDS = ['line-5', 'ring-16', 'grid-4x4', 'heavy_hex-3x7', 'heavy_hex-6x15']
+DEFAULT_CIRCUITS = ['ghz-5', 'qft-5', 'random-5', 'cascade-5', 'qft-10', 'random-10', 'cascade-10']
+PASSES = ('ChainLayout', 'TransformCxCascade', 'NoiseAdaptiveSwap')
+
+
+def success_probability(dag, properties):
+    """Estimates the probability that a routed circuit runs without errors,
+    as the product of the reliabilities of its gates and measurements.
+
+    Args:
+        dag (DAGCircuit): a physical circuit, swaps are counted as three cnots.
+        properties (BackendProperties or Calibration): backend properties object.
+
+    Returns:
+        float: the estimated success probability, see ExpectedFidelity.
+    """
+    return expected_fidelity(dag, properties)
+
+
+def _unrolled(circuit):
+    return transpile(circuit, basis_gates=BASIS_GATES, optimization_level=0)
+
+
+def _bench_chain_layout(backend, circuit, params):
+    dag = circuit_to_dag(_unrolled(circuit))
+    layout_pass = ChainLayout(backend.coupling_map, backend.properties, readout=True)
+    start = time.perf_counter()
+    layout_pass.run(dag)
+    return {'time': time.perf_counter() - start}
+
+
+def _bench_transform_cx_cascade(backend, circuit, params):
+    dag = circuit_to_dag(_unrolled(circuit))
+    cx_before = dag.count_ops().get('cx', 0)
+    start = time.perf_counter()
+    new_dag = TransformCxCascade().run(dag)
+    elapsed = time.perf_counter() - start
+    return {'time': elapsed, 'cx_before': cx_before, 'cx': new_dag.count_ops().get('cx', 0)}
+
+
+def _bench_noise_adaptive_swap(backend, circuit, params):
+    coupling_map = backend.coupling_map
+    layout = PassManager([TrivialLayout(coupling_map), FullAncillaAllocation(coupling_map),
+                          EnlargeWithAncilla(), ApplyLayout()])
+    dag = circuit_to_dag(layout.run(_unrolled(circuit)))
+    swap_pass = NoiseAdaptiveSwap(coupling_map, backend.properties, readout=True, **params)
+    start = time.perf_counter()
+    new_dag = swap_pass.run(dag)
+    elapsed = time.perf_counter() - start
+    return {'time': elapsed,
+            'swaps': new_dag.count_ops().get('swap', 0),
+            'depth': new_dag.depth(),
+            'success_probability': success_probability(new_dag, backend.properties)}
+
+
+BENCHMARKS = {
+    'ChainLayout': _bench_chain_layout,
+    'TransformCxCascade': _bench_transform_cx_cascade,
+    'NoiseAdaptiveSwap': _bench_noise_adaptive_swap
+}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def _child(conn, pass_name, backend_name, circuit_name, params, seed):
+    try:
+        backend = SyntheticBackend(backend_name, seed=seed) if backend_name is not None else None
+        circuit = benchmark_circuit(circuit_name, seed=seed)
+        result = BENCHMARKS[pass_name](backend, circuit, params)
+        result['status'] = 'ok'
+    except Exception as error:
+        result = {'status': 'error: %s: %s' % (error.__class__.__name__, error)}
+    result['peak_rss_mb'] = _peak_rss_mb()
+    conn.send(result)
+    conn.close()
+
+
+def benchmark_key(result):
+    """
+    Args:
+        result (dict): a benchmark result.
+
+    Returns:
+        str: identifier of the benchmark, used to match results with a baseline.
+    """
+    return '%s %s %s %s' % (result['pass'], result['backend'], result['circuit'],
+                            json.dumps(result['params'], sort_keys=True))
+
+
+def run_benchmark(pass_name, backend_name, circuit_name, params=None, seed=1234, timeout=300):
+    """Runs a benchmark in a child process.
+
+    Args:
+        pass_name (str): name of the pass.
+        backend_name (str): synthetic backend, see SyntheticBackend, None for passes
+            that do not depend on the backend.
+        circuit_name (str): benchmark circuit, see benchmark_circuit().
+        params (dict): options of the pass.
+        seed (int): seed of calibration data and random circuits.
+        timeout (float): seconds after which the benchmark is stopped.
+
+    Returns:
+        dict: the benchmark result, with its status and measurements.
+    """
+    params = params or {}
+    result = {'pass': pass_name, 'backend': backend_name, 'circuit': circuit_name, 'params': params}
+    recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_child,
+                                      args=(send_conn, pass_name, backend_name, circuit_name, params, seed))
+    process.start()
+    send_conn.close()
+    try:
+        if recv_conn.poll(timeout):
+            result.update(recv_conn.recv())
+        else:
+            result['status'] = 'timeout'
+    except EOFError:
+        result['status'] = 'crashed'
+    process.terminate()
+    process.join()
+    return result
+
+
+def param_sets(search_depth, n_swaps, next_gates, alpha, front):
+    """
+    Returns:
+        list: NoiseAdaptiveSwap options for every combination of the given values.
+    """
+    return [{'search_depth': d, 'n_swaps': n, 'next_gates': g, 'alpha': a, 'front': f}
+            for d, n, g, a, f in itertools.product(search_depth, n_swaps, next_gates, alpha, front)]
+
+
+def run_benchmarks(backends, circuits, passes=PASSES, swap_params=None, seed=1234, timeout=300, log=None):
+    """
+    Args:
+        backends (list): synthetic backends.
+        circuits (list): benchmark circuits.
+        passes (list): passes to benchmark.
+        swap_params (list): NoiseAdaptiveSwap options, see param_sets().
+        seed (int): seed of calibration data and random circuits.
+        timeout (float): seconds after which a benchmark is stopped.
+        log (file): if given, results are written to it as soon as they are available.
+
+    Returns:
+        list: the benchmark results.
+    """
+    if swap_params is None:
+        swap_params = param_sets([4], [4], [5], [0.5], [False, True])
+    results = []
+
+    def append(result):
+        results.append(result)
+        if log is not None:
+            print(format_result(result), file=log, flush=True)
+
+    # TransformCxCascade does not depend on the backend
+    if 'TransformCxCascade' in passes:
+        for circuit_name in circuits:
+            append(run_benchmark('TransformCxCascade', None, circuit_name, {}, seed, timeout))
+    for backend_name in backends:
+        num_qubits = SyntheticBackend(backend_name, seed=seed).num_qubits()
+        for circuit_name in circuits:
+            if benchmark_circuit(circuit_name, seed=seed).num_qubits > num_qubits:
+                continue
+            if 'ChainLayout' in passes:
+                append(run_benchmark('ChainLayout', backend_name, circuit_name, {}, seed, timeout))
+            if 'NoiseAdaptiveSwap' in passes:
+                for params in swap_params:
+                    append(run_benchmark('NoiseAdaptiveSwap', backend_name, circuit_name, params, seed, timeout))
+    return results
+
+
+def format_result(result):
+    """
+    Args:
+        result (dict): a benchmark result.
+
+    Returns:
+        str: one line summary of the result.
+    """
+    values = []
+    for name, fmt in (('time', '%.3fs'), ('peak_rss_mb', '%.0fMB'), ('swaps', '%d swaps'),
+                      ('success_probability', 'p=%.4f'), ('cx_before', '%d'), ('cx', '-> %d cx')):
+        if result.get(name) is not None:
+            values.append(fmt % result[name])
+    return '%-18s %-16s %-12s %-76s %-8s %s' % (
+        result['pass'], result['backend'] or '-', result['circuit'], json.dumps(result['params'], sort_keys=True),
+        result['status'] if result['status'] in ('ok', 'timeout', 'crashed') else 'error', ' '.join(values))
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Compares results with a baseline.
+
+    Args:
+        results (list): benchmark results.
+        baseline (list): baseline results.
+        tolerance (float): relative slow down, or memory increase, allowed before reporting a regression.
+
+    Returns:
+        list: description of every regression found.
+    """
+    baseline = {benchmark_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        key = benchmark_key(result)
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if base['status'] == 'ok' and result['status'] != 'ok':
+            regressions.append('%s: %s, was ok' % (key, result['status']))
+            continue
+        if result['status'] != 'ok' or base['status'] != 'ok':
+            continue
+        # small absolute differences are noise
+        if result['time'] > base['time'] * (1 + tolerance) and result['time'] - base['time'] > 0.05:
+            regressions.append('%s: time %.3fs, was %.3fs' % (key, result['time'], base['time']))
+        if result.get('peak_rss_mb') and base.get('peak_rss_mb') and \
+                result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance) and \
+                result['peak_rss_mb'] - base['peak_rss_mb'] > 10:
+            regressions.append('%s: peak RSS %.0fMB, was %.0fMB' % (key, result['peak_rss_mb'], base['peak_rss_mb']))
+        for name in ('swaps', 'cx'):
+            if name in base and result[name] > base[name]:
+                regressions.append('%s: %d %s, was %d' % (key, result[name], name, base[name]))
+        if 'success_probability' in base and result['success_probability'] < base['success_probability'] - 1e-12:
+            regressions.append('%s: success probability %.6f, was %.6f'
+                               % (key, result['success_probability'], base['success_probability']))
+    return regressions
+
+
+def _bool(value):
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Routing benchmarks on synthetic backends.')
+    parser.add_argument('--backends', nargs='+', default=DEFAULT_BACKENDS,
+                        help='synthetic backends, such as line-5, ring-16, grid-4x4, heavy_hex-3x7')
+    parser.add_argument('--circuits', nargs='+', default=DEFAULT_CIRCUITS,
+                        help='benchmark circuits, such as ghz-5, qft-8, random-10, cascade-8')
+    parser.add_argument('--passes', nargs='+', default=list(PASSES), choices=PASSES)
+    parser.add_argument('--search-depth', nargs='+', type=int, default=[4])
+    parser.add_argument('--n-swaps', nargs='+', type=int, default=[4])
+    parser.add_argument('--next-gates', nargs='+', type=int, default=[5])
+    parser.add_argument('--alpha', nargs='+', type=float, default=[0.5])
+    parser.add_argument('--front', nargs='+', type=_bool, default=[False, True])
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--timeout', type=float, default=300, help='seconds allowed to every benchmark')
+    parser.add_argument('--save-baseline', metavar='FILE', help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare the results with a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slow down allowed before reporting a regression')
+    args = parser.parse_args(argv)
+
+    swap_params = param_sets(args.search_depth, args.n_swaps, args.next_gates, args.alpha, args.front)
+    results = run_benchmarks(args.backends, args.circuits, args.passes, swap_params,
+                             seed=args.seed, timeout=args.timeout, log=sys.stdout)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'seed': args.seed, 'results': results}, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['seed'] != args.seed:
+            print('Warning: baseline seed %d differs from %d' % (baseline['seed'], args.seed))
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        print('%d regressions' % len(regressions))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,5 @@
-from .heavy_output_generation import hog
-from .l1_norm import l1_norm
-from .cx_metrics import cx_count, cx_depth
\ No newline at end of file
+from .heavy_output_generation import hog, HeavyOutputGeneration
+from .l1_norm import l1_norm, l1_norms
+from .cx_metrics import cx_count, cx_depth, cx_metrics
+from .circuit_report import circuit_report, CircuitReport
+from .expected_fidelity import expected_fidelity, ExpectedFidelity
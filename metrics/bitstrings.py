@@ -0,0 +1,59 @@
+import numpy as np
+
+# bitstrings up to this length are packed in int64 indices
+MAX_PACKED_BITS = 62
+
+
+def bitstring_indices(bitstrings, num_bits):
+    """Packs bitstrings into integer indices, the leftmost bit being the most significant.
+
+    Args:
+        bitstrings (list): bitstrings such as '0110'.
+        num_bits (int): number of bits of a valid bitstring.
+
+    Returns:
+        (tuple):
+            indices (numpy.ndarray): index of every bitstring, 0 if not valid.
+            valid (numpy.ndarray): whether every bitstring is made of `num_bits` zeros and ones.
+    """
+    if num_bits > MAX_PACKED_BITS:
+        valid = np.array([len(key) == num_bits and set(key) <= {'0', '1'} for key in bitstrings], dtype=bool)
+        indices = np.array([int(key, 2) if ok else 0 for key, ok in zip(bitstrings, valid)], dtype=object)
+        return indices, valid
+    # one extra character to tell longer strings apart
+    codes = np.array(bitstrings, dtype='U%d' % (num_bits + 1)).view(np.uint32).reshape(-1, num_bits + 1)
+    ones = codes[:, :num_bits] == ord('1')
+    valid = (codes[:, num_bits] == 0) & np.all(ones | (codes[:, :num_bits] == ord('0')), axis=1)
+    weights = np.left_shift(1, np.arange(num_bits - 1, -1, -1, dtype=np.int64))
+    indices = ones.astype(np.int64) @ weights
+    return np.where(valid, indices, 0), valid
+
+
+def strip_separators(bitstrings):
+    """
+    Args:
+        bitstrings (iterable): bitstrings, possibly with spaces between the bits of different
+            registers such as '01 10'.
+
+    Returns:
+        list: the bitstrings without spaces.
+    """
+    return [key.replace(' ', '') for key in bitstrings]
+
+
+def distribution_arrays(distribution, num_bits, strip=False):
+    """
+    Args:
+        distribution (dict): counts or probabilities keyed by bitstring.
+        num_bits (int): number of bits of a valid bitstring.
+        strip (bool): whether to remove the spaces between registers first, default is False.
+
+    Returns:
+        (tuple):
+            indices (numpy.ndarray): index of every valid bitstring, see bitstring_indices().
+            values (numpy.ndarray): count or probability of every valid bitstring.
+    """
+    keys = strip_separators(distribution) if strip else list(distribution.keys())
+    indices, valid = bitstring_indices(keys, num_bits)
+    values = np.fromiter(distribution.values(), dtype=float, count=len(distribution))
+    return indices[valid], values[valid]
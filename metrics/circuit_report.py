@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+from .expected_fidelity import ExpectedFidelity
+from .instructions import circuit_instructions, circuit_qubits, instruction_wires
+
+CircuitReport = namedtuple('CircuitReport', ['cx_count', 'cx_depth', 'depth', 'swap_count', 'success_probability'])
+
+
+def circuit_report(circuit, backend_prop=None):
+    """Measures a compiled circuit in a single pass over its instructions, in topological order,
+    keeping the depth and the cnot depth reached on every wire.
+    Swaps are counted as three cnots, other multi-qubit gates are not counted as cnots.
+
+    Args:
+        circuit (QuantumCircuit or DAGCircuit): a physical circuit.
+        backend_prop (BackendProperties or Calibration or ExpectedFidelity): backend properties object,
+            or an estimator to report many circuits without building its tables again,
+            default is None (no success probability).
+
+    Returns:
+        CircuitReport: cnot count, cnot depth, depth as in DAGCircuit.depth(), number of swaps,
+            and success probability (None without backend properties), see ExpectedFidelity.
+    """
+    qubit_ids = {qubit: k for k, qubit in enumerate(circuit_qubits(circuit))}
+    if backend_prop is None or isinstance(backend_prop, ExpectedFidelity):
+        estimator = backend_prop
+    else:
+        estimator = ExpectedFidelity(backend_prop)
+
+    wire_depth = {}
+    wire_cx_depth = {}
+    depth = 0
+    cx_depth = 0
+    cx_count = 0
+    swap_count = 0
+    gates = []
+    wire_time = {}
+    for inst, qargs, cargs in circuit_instructions(circuit):
+        wires = instruction_wires(inst, qargs, cargs)
+        gate_depth = max(wire_depth.get(wire, 0) for wire in wires) + 1
+        for wire in wires:
+            wire_depth[wire] = gate_depth
+        depth = max(depth, gate_depth)
+
+        if inst.name in ('cx', 'swap'):
+            if inst.name == 'cx':
+                num_cx = 1
+            else:
+                num_cx = 3
+                swap_count += 1
+            cx_count += num_cx
+            gate_cx_depth = max(wire_cx_depth.get(wire, 0) for wire in wires) + num_cx
+            for wire in wires:
+                wire_cx_depth[wire] = gate_cx_depth
+            cx_depth = max(cx_depth, gate_cx_depth)
+        if estimator is not None:
+            estimator.visit(inst, qargs, cargs, qubit_ids, gates, wire_time)
+
+    success = estimator.fidelity(gates, wire_time, qubit_ids) if estimator is not None else None
+    return CircuitReport(cx_count, cx_depth, depth, swap_count, success)
@@ -1,26 +1,94 @@
-from qiskit.converters import circuit_to_dag
-from qiskit import transpile
+from qiskit import QuantumCircuit, transpile
 
+DIRECTIVES = ("barrier", "snapshot", "save", "load", "noise")
 
-def cx_depth(circuit):
+
+def cx_depth(circuits):
     """
+    Args:
+        circuits (QuantumCircuit or list): circuit or list of circuits.
 
+    Returns:
+        int or list: number of cnots on the longest path of cnots of every circuit,
+            once unrolled to ['u3', 'cx'].
+    """
+    metrics = cx_metrics(circuits)
+    if isinstance(circuits, QuantumCircuit):
+        return metrics[1]
+    return [depth for _, depth in metrics]
+
+
+def cx_count(circuits):
+    """
     Args:
-        op (qiskit.circuit.Instruction):
-        circuit (qiskit.circuit.QuantumCircuit):
+        circuits (QuantumCircuit or list): circuit or list of circuits.
 
     Returns:
+        int or list: number of cnots of every circuit, once unrolled to ['u3', 'cx'].
+    """
+    metrics = cx_metrics(circuits)
+    if isinstance(circuits, QuantumCircuit):
+        return metrics[0]
+    return [count for count, _ in metrics]
+
+
+def cx_metrics(circuits):
+    """Counts the cnots of circuits and the cnots on their longest path of cnots.
+    Circuits with multi-qubit gates other than cnots are first unrolled to ['u3', 'cx'],
+    all of them in a single call to transpile, without optimizations so that the cnots
+    are counted as written, like in the circuits already in the cx basis.
 
+    Args:
+        circuits (QuantumCircuit or list): circuit or list of circuits.
+
+    Returns:
+        tuple or list: cnot count and cnot depth of every circuit.
     """
-    circuit = transpile(circuit, basis_gates=['u3', 'cx'])
-    dag = circuit_to_dag(circuit)
-    gates = [gate for gate in dag.nodes() if gate.type == 'op']
-    for gate in gates:
-        if gate.op.name != 'cx':
-            dag.remove_op_node(gate)
-    return dag.depth()
+    if isinstance(circuits, QuantumCircuit):
+        return cx_metrics([circuits])[0]
+    circuits = list(circuits)
+    unroll = [k for k, circuit in enumerate(circuits) if not in_cx_basis(circuit)]
+    if unroll:
+        unrolled = transpile([circuits[k] for k in unroll], basis_gates=['u3', 'cx'], optimization_level=0)
+        for k, circuit in zip(unroll, unrolled):
+            circuits[k] = circuit
+    return [_count_and_depth(circuit) for circuit in circuits]
 
 
-def cx_count(circuit):
-    circuit = transpile(circuit, basis_gates=['u3', 'cx'])
-    return len(circuit_to_dag(circuit).two_qubit_ops())
+def in_cx_basis(circuit):
+    """
+    Args:
+        circuit (QuantumCircuit): a circuit.
+
+    Returns:
+        bool: whether cnots are the only gates of the circuit acting on more than one qubit.
+    """
+    return all(len(qargs) < 2 or inst.name == 'cx' or inst.name in DIRECTIVES
+               for inst, qargs, _ in circuit.data)
+
+
+def _count_and_depth(circuit):
+    """Single pass over the instructions, in topological order, keeping the number of cnots
+    on the longest path of cnots ending on every wire.
+
+    Args:
+        circuit (QuantumCircuit): a circuit in the cx basis.
+
+    Returns:
+        tuple: cnot count and cnot depth.
+    """
+    wire_depth = {}
+    count = 0
+    depth = 0
+    for inst, qargs, _ in circuit.data:
+        if inst.name != 'cx':
+            continue
+        wires = list(qargs)
+        if inst.condition is not None:
+            wires.extend(inst.condition[0])
+        gate_depth = max(wire_depth.get(wire, 0) for wire in wires) + 1
+        for wire in wires:
+            wire_depth[wire] = gate_depth
+        count += 1
+        depth = max(depth, gate_depth)
+    return count, depth
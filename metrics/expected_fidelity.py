@@ -0,0 +1,187 @@
+import numpy as np
+
+from passes import Calibration
+
+from .instructions import circuit_instructions, circuit_qubits, instruction_wires
+
+
+def expected_fidelity(circuits, backend_prop, decoherence=False):
+    """
+    Args:
+        circuits (QuantumCircuit or DAGCircuit or list): physical circuit or list of physical circuits.
+        backend_prop (BackendProperties or Calibration): backend properties object.
+        decoherence (bool): whether to include the decay of the qubits, default is False.
+
+    Returns:
+        float or numpy.ndarray: expected fidelity of every circuit, see ExpectedFidelity.
+    """
+    estimator = ExpectedFidelity(backend_prop, decoherence)
+    if isinstance(circuits, (list, tuple)):
+        return estimator.estimates(circuits)
+    return estimator.estimate(circuits)
+
+
+class ExpectedFidelity:
+    """
+    Estimates the probability that physical circuits run without errors from the calibration
+    data of a backend, without simulating them: the product of the reliabilities of their gates
+    and of the readouts of their measured qubits.
+
+    With decoherence, gates are scheduled as soon as possible using their calibrated lengths and
+    every qubit decays by exp(-t / T1 - t / T2), t being the end of its last gate.
+
+    Swaps are counted as three cnots. Gates without calibration data are assumed to be perfect
+    and instantaneous, except cnots between qubits with no calibrated cnot in either direction,
+    which make the estimate NaN.
+    """
+
+    def __init__(self, backend_prop, decoherence=False):
+        """ExpectedFidelity initializer.
+
+        Args:
+            backend_prop (BackendProperties or Calibration): backend properties object.
+            decoherence (bool): whether to include the decay of the qubits, default is False.
+        """
+        calibration = Calibration.from_backend(backend_prop)
+        self.calibration = calibration
+        self.decoherence = decoherence
+        self._size = calibration.size()
+        self._num_qubits = calibration.num_qubits
+
+        # log-reliabilities of all gates in a single table: cnots by (control, target),
+        # then single-qubit gates by (name, qubit), readouts by qubit and a NaN for uncalibrated cnots
+        with np.errstate(divide='ignore'):
+            tables = [np.log(calibration.cx_table(calibration.cx_reliability())).ravel()]
+            self._gate_offset = {}
+            offset = self._size * self._size
+            for name, error in calibration.gate_error.items():
+                self._gate_offset[name] = offset
+                tables.append(np.log(1.0 - np.nan_to_num(error)))
+                offset += self._num_qubits
+            self._readout_offset = offset
+            tables.append(np.log(1.0 - np.nan_to_num(calibration.readout_error)))
+        self._uncalibrated = offset + self._num_qubits
+        tables.append([np.nan])
+        self._log_reliab = np.concatenate(tables)
+
+        self._cx_length = np.nan_to_num(calibration.cx_table(calibration.cx_length)).tolist()
+        self._gate_length = {name: np.nan_to_num(length).tolist()
+                             for name, length in calibration.gate_length.items()}
+        with np.errstate(divide='ignore'):
+            self._decay_rate = (np.nan_to_num(1.0 / calibration.t1) + np.nan_to_num(1.0 / calibration.t2)).tolist()
+
+    def estimate(self, circuit):
+        """
+        Args:
+            circuit (QuantumCircuit or DAGCircuit): a physical circuit.
+
+        Returns:
+            float: the expected fidelity of the circuit.
+        """
+        return float(self.estimates([circuit])[0])
+
+    def estimates(self, circuits):
+        """Estimates many circuits, summing the log-reliabilities of all their gates at once.
+
+        Args:
+            circuits (list): physical circuits.
+
+        Returns:
+            numpy.ndarray: estimate() of every circuit.
+        """
+        indices = []
+        circuit_ids = []
+        log_decay = np.zeros(len(circuits))
+        for k, circuit in enumerate(circuits):
+            gates, log_decay[k] = self._walk(circuit)
+            indices.extend(gates)
+            circuit_ids.extend([k] * len(gates))
+        log_reliab = np.bincount(np.array(circuit_ids, dtype=int), self._log_reliab[np.array(indices, dtype=int)],
+                                 minlength=len(circuits))
+        return np.exp(log_reliab + log_decay)
+
+    def _walk(self, circuit):
+        """Single pass over the instructions of a circuit, in topological order.
+
+        Args:
+            circuit (QuantumCircuit or DAGCircuit): a physical circuit.
+
+        Returns:
+            (tuple):
+                gates (list): index in the log-reliability table of every gate and readout.
+                log_decay (float): log of the decay of the qubits, 0 without decoherence.
+        """
+        qubit_ids = {qubit: k for k, qubit in enumerate(circuit_qubits(circuit))}
+        gates = []
+        wire_time = {}
+        for inst, qargs, cargs in circuit_instructions(circuit):
+            self.visit(inst, qargs, cargs, qubit_ids, gates, wire_time)
+        return gates, self.log_decay(wire_time, qubit_ids)
+
+    def visit(self, inst, qargs, cargs, qubit_ids, gates, wire_time):
+        """Adds an instruction to the estimate of a circuit being walked in topological order,
+        so that other single-pass metrics can share the walk, see circuit_report().
+
+        Args:
+            inst (Instruction): the instruction.
+            qargs (list): qubits of the instruction.
+            cargs (list): clbits of the instruction.
+            qubit_ids (dict): physical index of every qubit of the circuit.
+            gates (list): index in the log-reliability table of every gate and readout so far,
+                the ones of the instruction are appended to it.
+            wire_time (dict): end of the last gate on every wire so far, updated with decoherence.
+        """
+        size = self._size
+        name = inst.name
+        qubits = [qubit_ids[qubit] for qubit in qargs]
+        duration = 0.0
+        if name in ('cx', 'swap'):
+            control, target = qubits
+            pairs = [(control, target)] if name == 'cx' else \
+                [(control, target), (target, control), (control, target)]
+            for a, b in pairs:
+                if a < size and b < size:
+                    gates.append(a * size + b)
+                    duration += self._cx_length[a][b]
+                else:
+                    gates.append(self._uncalibrated)
+        elif len(qubits) == 1 and qubits[0] < self._num_qubits:
+            if name == 'measure':
+                gates.append(self._readout_offset + qubits[0])
+            elif name in self._gate_offset:
+                gates.append(self._gate_offset[name] + qubits[0])
+                duration = self._gate_length[name][qubits[0]]
+        if self.decoherence:
+            wires = instruction_wires(inst, qargs, cargs)
+            end = max(wire_time.get(wire, 0.0) for wire in wires) + duration
+            for wire in wires:
+                wire_time[wire] = end
+
+    def log_decay(self, wire_time, qubit_ids):
+        """
+        Args:
+            wire_time (dict): end of the last gate on every wire, see visit().
+            qubit_ids (dict): physical index of every qubit of the circuit.
+
+        Returns:
+            float: log of the decay of the qubits, 0 without decoherence.
+        """
+        log_decay = 0.0
+        for wire, time in wire_time.items():
+            q = qubit_ids.get(wire)
+            if q is not None and q < self._num_qubits:
+                log_decay -= self._decay_rate[q] * time
+        return log_decay
+
+    def fidelity(self, gates, wire_time, qubit_ids):
+        """
+        Args:
+            gates (list): index in the log-reliability table of every gate and readout, see visit().
+            wire_time (dict): end of the last gate on every wire, see visit().
+            qubit_ids (dict): physical index of every qubit of the circuit.
+
+        Returns:
+            float: the expected fidelity of the visited circuit.
+        """
+        log_reliab = self._log_reliab[np.array(gates, dtype=int)].sum()
+        return float(np.exp(log_reliab + self.log_decay(wire_time, qubit_ids)))
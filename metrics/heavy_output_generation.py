@@ -1,17 +1,117 @@
-from statistics import median
+from itertools import islice
+
+import numpy as np
+
+from .bitstrings import MAX_PACKED_BITS, bitstring_indices, distribution_arrays, strip_separators
+
+# a bitmap of heavy outputs is used when the number of bitstrings is at most
+# this many times the number of bitstrings in the ideal distribution
+BITMAP_FACTOR = 8
+
+# number of shots packed at a time when scoring a stream of shots
+SHOTS_CHUNK = 8192
 
 
 def hog(real_counts, ideal_probs):
-    total_real = 0
-    for key in real_counts:
-        total_real += real_counts[key]
-
-    med = median(ideal_probs.values())
-
-    hog = 0
-    for key in real_counts:
-        if key in ideal_probs:
-            if ideal_probs[key] > med:
-                hog += real_counts[key]
-    hog /= total_real
-    return hog
+    """
+    Args:
+        real_counts (dict): measured counts keyed by bitstring.
+        ideal_probs (dict): ideal probabilities keyed by bitstring.
+
+    Returns:
+        float: heavy output generation, see HeavyOutputGeneration.
+    """
+    return HeavyOutputGeneration(ideal_probs).score(real_counts)
+
+
+class HeavyOutputGeneration:
+    """
+    Scores measured distributions by the fraction of shots that are heavy outputs,
+    i.e. bitstrings whose ideal probability is greater than the median one.
+
+    The heavy outputs are packed once per ideal distribution, as a bitmap over all bitstrings
+    if there are few enough of them, otherwise as a sorted array of bitstring indices.
+    Spaces between the registers of multi-register bitstrings, such as '01 10', are ignored.
+    """
+
+    def __init__(self, ideal_probs):
+        """HeavyOutputGeneration initializer.
+
+        Args:
+            ideal_probs (dict): ideal probabilities keyed by bitstring.
+        """
+        self.num_bits = len(next(iter(ideal_probs)).replace(' ', ''))
+        self.median = float(np.median(np.fromiter(ideal_probs.values(), dtype=float, count=len(ideal_probs))))
+        indices, probs = distribution_arrays(ideal_probs, self.num_bits, strip=True)
+        self.heavy = np.unique(indices[probs > self.median])
+        self._bitmap = None
+        if self.num_bits <= MAX_PACKED_BITS and 2**self.num_bits <= BITMAP_FACTOR * len(ideal_probs):
+            self._bitmap = np.zeros(2**self.num_bits, dtype=bool)
+            self._bitmap[self.heavy] = True
+
+    def is_heavy(self, indices):
+        """
+        Args:
+            indices (numpy.ndarray): bitstring indices, see bitstring_indices().
+
+        Returns:
+            numpy.ndarray: whether every bitstring is a heavy output.
+        """
+        if self._bitmap is not None:
+            return self._bitmap[indices]
+        if not len(self.heavy):
+            return np.zeros(len(indices), dtype=bool)
+        position = np.minimum(np.searchsorted(self.heavy, indices), len(self.heavy) - 1)
+        return self.heavy[position] == indices
+
+    def score(self, real_counts):
+        """
+        Args:
+            real_counts (dict): measured counts keyed by bitstring.
+
+        Returns:
+            float: fraction of the shots that are heavy outputs.
+        """
+        indices, counts = distribution_arrays(real_counts, self.num_bits, strip=True)
+        return float(counts[self.is_heavy(indices)].sum() / sum(real_counts.values()))
+
+    def scores(self, real_counts_list):
+        """Scores a batch of measured distributions, packing all their bitstrings at once.
+
+        Args:
+            real_counts_list (list): measured counts keyed by bitstring, one dict per run.
+
+        Returns:
+            numpy.ndarray: score() of every run.
+        """
+        runs = len(real_counts_list)
+        keys = strip_separators(key for real_counts in real_counts_list for key in real_counts)
+        counts = np.fromiter((c for real_counts in real_counts_list for c in real_counts.values()),
+                             dtype=float, count=len(keys))
+        run = np.repeat(np.arange(runs), [len(real_counts) for real_counts in real_counts_list])
+        indices, valid = bitstring_indices(keys, self.num_bits)
+        heavy = valid.copy()
+        heavy[valid] = self.is_heavy(indices[valid])
+        return (np.bincount(run, np.where(heavy, counts, 0.0), minlength=runs)
+                / np.bincount(run, counts, minlength=runs))
+
+    def score_shots(self, shots):
+        """Scores a stream of shots without counting them first.
+
+        Args:
+            shots (iterable): measured bitstring of every shot.
+
+        Returns:
+            float: fraction of the shots that are heavy outputs.
+        """
+        shots = iter(shots)
+        heavy = 0
+        total = 0
+        while True:
+            chunk = list(islice(shots, SHOTS_CHUNK))
+            if not chunk:
+                break
+            indices, valid = bitstring_indices(strip_separators(chunk), self.num_bits)
+            heavy += int(np.count_nonzero(self.is_heavy(indices[valid])))
+            total += len(chunk)
+        return heavy / total
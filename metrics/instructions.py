@@ -0,0 +1,38 @@
+from qiskit import QuantumCircuit
+
+
+def circuit_qubits(circuit):
+    """
+    Args:
+        circuit (QuantumCircuit or DAGCircuit): a circuit.
+
+    Returns:
+        list: qubits of the circuit, in the order of their indices.
+    """
+    if isinstance(circuit, QuantumCircuit):
+        return circuit.qubits
+    return circuit.qubits()
+
+
+def circuit_instructions(circuit):
+    """
+    Args:
+        circuit (QuantumCircuit or DAGCircuit): a circuit.
+
+    Returns:
+        iterable: (instruction, qargs, cargs) of every instruction, in topological order.
+    """
+    if isinstance(circuit, QuantumCircuit):
+        return circuit.data
+    return ((node.op, node.qargs, node.cargs) for node in circuit.topological_op_nodes())
+
+
+def instruction_wires(inst, qargs, cargs):
+    """
+    Returns:
+        list: qubits and clbits of an instruction, including the clbits of its condition.
+    """
+    wires = list(qargs) + list(cargs)
+    if inst.condition is not None:
+        wires.extend(inst.condition[0])
+    return wires
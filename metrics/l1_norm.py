@@ -1,20 +1,59 @@
+import numpy as np
+
+from .bitstrings import MAX_PACKED_BITS, distribution_arrays
+
+# dense arrays are used when the number of bitstrings is at most
+# this many times the number of bitstrings in either distribution
+DENSE_FACTOR = 4
+
+
 def l1_norm(real_counts, ideal_probs):
-    total_real = 0
-    for key in real_counts:
-        total_real += real_counts[key]
-
-    n_bits = len(list(ideal_probs.keys())[0])
-    keys = []
-    for i in range(2**n_bits):
-        keys.append(bin(i).split('b')[1].zfill(n_bits))
-
-    l1n = 0
-    for key in keys:
-        if key in real_counts and key in ideal_probs:
-            l1n += abs(real_counts[key]/total_real - ideal_probs[key])
-        elif key in real_counts:
-            l1n += abs(real_counts[key]/total_real)
-        elif key in ideal_probs:
-            l1n += abs(0.0 - ideal_probs[key])
-    l1n /= total_real
-    return l1n
+    """
+    Args:
+        real_counts (dict): measured counts keyed by bitstring.
+        ideal_probs (dict): ideal probabilities keyed by bitstring.
+
+    Returns:
+        float: L1 distance between the measured and the ideal distributions,
+            divided by the number of shots.
+    """
+    return float(l1_norms([real_counts], ideal_probs)[0])
+
+
+def l1_norms(real_counts_list, ideal_probs):
+    """Scores many measured distributions against the same ideal distribution,
+    whose bitstrings are packed once.
+
+    Only bitstrings with as many bits as the ideal ones are taken into account,
+    and only the ones in either distribution are visited.
+
+    Args:
+        real_counts_list (list): measured counts keyed by bitstring, one dict per run.
+        ideal_probs (dict): ideal probabilities keyed by bitstring.
+
+    Returns:
+        numpy.ndarray: l1_norm() of every run.
+    """
+    num_bits = len(next(iter(ideal_probs)))
+    ideal_indices, ideal_values = distribution_arrays(ideal_probs, num_bits)
+    norms = np.zeros(len(real_counts_list))
+    for k, real_counts in enumerate(real_counts_list):
+        total_real = sum(real_counts.values())
+        real_indices, real_values = distribution_arrays(real_counts, num_bits)
+        diff = _difference(real_indices, real_values / total_real, ideal_indices, ideal_values, num_bits)
+        norms[k] = np.abs(diff).sum() / total_real
+    return norms
+
+
+def _difference(indices_a, values_a, indices_b, values_b, num_bits):
+    """
+    Returns:
+        numpy.ndarray: difference of two distributions over the bitstrings in either of them,
+            dense over all bitstrings if there are few enough of them.
+    """
+    support = len(indices_a) + len(indices_b)
+    if num_bits <= MAX_PACKED_BITS and 2**num_bits <= DENSE_FACTOR * support:
+        size = 2**num_bits
+        return np.bincount(indices_a, values_a, minlength=size) - np.bincount(indices_b, values_b, minlength=size)
+    union, inverse = np.unique(np.concatenate((indices_a, indices_b)), return_inverse=True)
+    return np.bincount(inverse, np.concatenate((values_a, -values_b)), minlength=len(union))
@@ -38,7 +38,7 @@ from qiskit.transpiler.passes import CheckCXDirection
 
 from qiskit.transpiler import TranspilerError, CouplingMap
 
-from passes import ChainLayout, NoiseAdaptiveSwap, TransformCxCascade
+from passes import Calibration, ChainLayout, NoiseAdaptiveSwap, TransformCxCascade
 
 def noise_pass_manager(basis_gates=None, initial_layout=None, coupling_map=None,
                        layout_method=None, translation_method=None, seed_transpiler=None, backend=None,
@@ -94,6 +94,9 @@ def noise_pass_manager(basis_gates=None, initial_layout=None, coupling_map=None,
     if isinstance(coupling_map, list):
         coupling_map = CouplingMap(couplinglist=coupling_map)
 
+    # parse the calibration data once for the noise-aware passes
+    calibration = Calibration.from_backend(backend_properties)
+
     initial_layout = initial_layout
     layout_method = layout_method or 'dense'
     routing_method = routing_method or 'stochastic'
@@ -119,7 +122,7 @@ def noise_pass_manager(basis_gates=None, initial_layout=None, coupling_map=None,
     elif layout_method == 'sabre':
         _choose_layout_2 = SabreLayout(coupling_map, max_iterations=4, seed=seed_transpiler)
     elif layout_method == 'chain':
-        _choose_layout_2 = ChainLayout(coupling_map, backend_properties, readout=readout)
+        _choose_layout_2 = ChainLayout(coupling_map, calibration, readout=readout)
     else:
         raise TranspilerError("Invalid layout method %s." % layout_method)
 
@@ -142,8 +145,8 @@ def noise_pass_manager(basis_gates=None, initial_layout=None, coupling_map=None,
     elif routing_method == 'sabre':
         _swap += [SabreSwap(coupling_map, heuristic='decay', seed=seed_transpiler)]
     elif routing_method == 'noise_adaptive':
-        _swap += [NoiseAdaptiveSwap(coupling_map, backend_properties, swap_score=swap_score,
-                                    readout=readout, alpha=alpha, next_gates=next_gates, front=front)]
+        _swap += [NoiseAdaptiveSwap(coupling_map, calibration, readout=readout,
+                                    alpha=alpha, next_gates=next_gates, front=front)]
     else:
         raise TranspilerError("Invalid routing method %s." % routing_method)
 
@@ -0,0 +1,133 @@
+import numpy as np
+
+# seconds per unit of the times in backend properties
+TIME_UNITS = {'s': 1.0, 'ms': 1e-3, 'us': 1e-6, '\u00b5s': 1e-6, '\u03bcs': 1e-6, 'ns': 1e-9, 'ps': 1e-12}
+
+
+class Calibration:
+    """
+    Calibration data of a backend, parsed once from its properties into arrays
+    shared by ChainLayout and NoiseAdaptiveSwap:
+
+        * cx_qubits: (control, target) of every calibrated cnot, in the order of the properties,
+        * cx_error, cx_length: gate error and gate length of every calibrated cnot,
+        * gate_error, gate_length: gate error and gate length of every single-qubit gate
+          on every qubit, keyed by gate name,
+        * readout_error, t1, t2: readout error and coherence times of every qubit.
+
+    Missing values are NaN. Times are in seconds.
+    """
+
+    def __init__(self, backend_prop):
+        """Calibration initializer.
+
+        Args:
+            backend_prop (BackendProperties): backend properties object.
+        """
+        self.backend_name = getattr(backend_prop, 'backend_name', None)
+        self.num_qubits = len(backend_prop.qubits)
+        self.readout_error = np.full(self.num_qubits, np.nan)
+        self.t1 = np.full(self.num_qubits, np.nan)
+        self.t2 = np.full(self.num_qubits, np.nan)
+        for q, qubit_info in enumerate(backend_prop.qubits):
+            for info in qubit_info:
+                if info.name == 'readout_error':
+                    self.readout_error[q] = info.value
+                elif info.name == 'T1':
+                    self.t1[q] = _seconds(info)
+                elif info.name == 'T2':
+                    self.t2[q] = _seconds(info)
+
+        cx_qubits = []
+        cx_error = []
+        cx_length = []
+        self.gate_error = {}
+        self.gate_length = {}
+        for ginfo in backend_prop.gates:
+            error = np.nan
+            length = np.nan
+            for item in ginfo.parameters:
+                if item.name == 'gate_error':
+                    error = item.value
+                elif item.name == 'gate_length':
+                    length = _seconds(item)
+            if ginfo.gate == 'cx':
+                cx_qubits.append(ginfo.qubits)
+                cx_error.append(error)
+                cx_length.append(length)
+            elif len(ginfo.qubits) == 1 and ginfo.qubits[0] < self.num_qubits:
+                if ginfo.gate not in self.gate_error:
+                    self.gate_error[ginfo.gate] = np.full(self.num_qubits, np.nan)
+                    self.gate_length[ginfo.gate] = np.full(self.num_qubits, np.nan)
+                self.gate_error[ginfo.gate][ginfo.qubits[0]] = error
+                self.gate_length[ginfo.gate][ginfo.qubits[0]] = length
+        self.cx_qubits = np.array(cx_qubits, dtype=int).reshape(-1, 2)
+        self.cx_error = np.array(cx_error, dtype=float)
+        self.cx_length = np.array(cx_length, dtype=float)
+
+    @classmethod
+    def from_backend(cls, backend_prop):
+        """
+        Args:
+            backend_prop (BackendProperties or Calibration): backend properties object.
+
+        Returns:
+            Calibration: the parsed calibration data, `backend_prop` itself if already parsed,
+                None if `backend_prop` is None.
+        """
+        if backend_prop is None or isinstance(backend_prop, Calibration):
+            return backend_prop
+        return cls(backend_prop)
+
+    def cx_reliability(self, readout=False, floor=None):
+        """
+        Args:
+            readout (bool): whether to include the readout errors of both qubits.
+            floor (float): lower bound of the gate reliability before the readout errors
+                are included, default is None (no bound).
+
+        Returns:
+            numpy.ndarray: reliability of every calibrated cnot, in the order of cx_qubits,
+                1.0 if the gate error is missing.
+        """
+        cx_reliab = 1.0 - np.nan_to_num(self.cx_error)
+        if floor is not None:
+            cx_reliab = np.maximum(cx_reliab, floor)
+        if readout:
+            readout_reliab = 1.0 - self.readout_error
+            cx_reliab = cx_reliab * (readout_reliab[self.cx_qubits[:, 0]] * readout_reliab[self.cx_qubits[:, 1]])
+        return cx_reliab
+
+    def cx_table(self, values, size=None):
+        """
+        Args:
+            values (numpy.ndarray): a value for every calibrated cnot, in the order of cx_qubits.
+            size (int): number of qubits of the table, default is size().
+
+        Returns:
+            numpy.ndarray: the values indexed by (control, target), NaN where there is no cnot.
+                A cnot can be used in both directions, the calibration of the given one is preferred.
+        """
+        table = np.full((size or self.size(),) * 2, np.nan)
+        control, target = self.cx_qubits[:, 0], self.cx_qubits[:, 1]
+        table[target, control] = values
+        table[control, target] = values
+        return table
+
+    def size(self):
+        """
+        Returns:
+            int: number of qubits including the ones only appearing in cnot calibrations.
+        """
+        return max([self.num_qubits] + [int(q) + 1 for q in self.cx_qubits.ravel()])
+
+
+def _seconds(info):
+    """
+    Args:
+        info (Nduv): a time in backend properties.
+
+    Returns:
+        float: the time in seconds.
+    """
+    return info.value * TIME_UNITS.get(info.unit, 1.0)
@@ -1,11 +1,26 @@
 import logging
+from collections import OrderedDict, namedtuple
 
+import numpy as np
 from networkx import shortest_path
 
 from qiskit.transpiler import AnalysisPass, TranspilerError, CouplingMap, Layout
 
+from .Calibration import Calibration
+from .ChainSearch import ChainSearch
+from .RoutingTables import calibration_key, load_arrays, save_arrays
+
 logger = logging.getLogger(__name__)
 
+# number of chains kept in memory
+CHAIN_CACHE_SIZE = 256
+
+ChainCacheInfo = namedtuple('ChainCacheInfo', ['hits', 'disk_hits', 'misses', 'maxsize', 'currsize'])
+
+# chains shared by all the instances, by calibration, chain search and number of qubits
+_chain_cache = OrderedDict()
+_chain_cache_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
 
 class ChainLayout(AnalysisPass):
     """
@@ -15,16 +30,32 @@ class ChainLayout(AnalysisPass):
     If necessary, such outliers will be inserted in the chain after one of their neighbors.
     """
 
-    def __init__(self, coupling_map, backend_prop=None, readout=False):
+    def __init__(self, coupling_map, backend_prop=None, readout=False, cache_dir=None,
+                 search='greedy', time_limit=None, seed=0, restarts=200):
         """ChainLayout initializer.
 
         Args:
             coupling_map (CouplingMap or list): directed graph representing a coupling chain.
-            backend_prop (BackendProperties): backend properties object.
+            backend_prop (BackendProperties or Calibration): backend properties object.
+            readout (bool): whether to include readout errors in cx reliability.
+            cache_dir (str): directory where the cx reliability and the chains of each calibration
+                are cached, default is None (no on-disk cache).
+            search (str): 'greedy' to follow the coupling map from qubit 0, 'reliability' to search
+                for a long chain with reliable links, default is 'greedy'.
+            time_limit (float): seconds after which the reliability search returns the best chain
+                found so far, default is None (no limit).
+            seed (int): seed of the random restarts of the reliability search, default is 0.
+            restarts (int): number of random restarts of the reliability search, default is 200.
         Raises:
             TranspilerError: if invalid options.
         """
         super().__init__()
+        if search not in ('greedy', 'reliability'):
+            raise TranspilerError('Chain search %s is not valid' % search)
+        self.search = search
+        self.time_limit = time_limit
+        self.seed = seed
+        self.restarts = restarts
         if isinstance(coupling_map, list):
             self.coupling_map = CouplingMap(coupling_map)
         elif isinstance(coupling_map, CouplingMap):
@@ -35,32 +66,61 @@ class ChainLayout(AnalysisPass):
         self.coupling_graph = self.coupling_map.graph.to_undirected()
 
         self.backend_prop = backend_prop
+        # parsed only if the cx reliability is not in the cache
+        self.calibration = backend_prop if isinstance(backend_prop, Calibration) else None
+        self.cache_dir = cache_dir
+        self.readout = readout
+        # computed only when a cache is looked up
+        self._calibration_key = None
         # collect cx reliability data
         if self.backend_prop is not None:
-            if readout:
-                self.readout_reliability = dict()
-                i = 0
-                for q in backend_prop.qubits:
-                    for info in q:
-                        if info.name == 'readout_error':
-                            self.readout_reliability[i] = 1.0 - info.value
-                            i += 1
-
-            self.cx_reliab = dict()
-            for ginfo in self.backend_prop.gates:
-                if ginfo.gate == 'cx':
-                    for item in ginfo.parameters:
-                        if item.name == 'gate_error':
-                            g_reliab = max(1.0 - item.value, 10**(-10))
-                            break
-                        else:
-                            g_reliab = 1.0
-                    self.cx_reliab[(ginfo.qubits[0], ginfo.qubits[1])] = g_reliab
-                    self.cx_reliab[(ginfo.qubits[1], ginfo.qubits[0])] = g_reliab
-                    if readout:
-                        qubits_readout_reliab = self.readout_reliability[ginfo.qubits[0]] * self.readout_reliability[ginfo.qubits[1]]
-                        self.cx_reliab[(ginfo.qubits[0], ginfo.qubits[1])] *= qubits_readout_reliab
-                        self.cx_reliab[(ginfo.qubits[1], ginfo.qubits[0])] *= qubits_readout_reliab
+            self.cx_reliab = None
+            if cache_dir is not None:
+                key = self.cache_key()
+                arrays = load_arrays(cache_dir, key, ('chain_cx_reliab',))
+                if arrays is not None:
+                    self.cx_reliab = arrays['chain_cx_reliab']
+            if self.cx_reliab is None:
+                self.cx_reliab = self.cx_reliability(readout)
+                if cache_dir is not None:
+                    save_arrays(cache_dir, key, {'chain_cx_reliab': self.cx_reliab})
+            # link scores of best_subset(), qubits without cx data are not linked,
+            # log(0) would make the prefix sums useless
+            self._log_cx_reliab = np.log(np.maximum(self.cx_reliab, np.finfo(float).tiny))
+
+    def cache_key(self):
+        """
+        Returns:
+            str: calibration key of the cached cx reliability and chains, see calibration_key().
+                Derived from the parsed calibration if available, from a scan of the raw
+                backend properties otherwise.
+        """
+        if self._calibration_key is None:
+            calibration = self.calibration if self.calibration is not None else self.backend_prop
+            self._calibration_key = calibration_key(self.coupling_map, calibration, self.readout)
+        return self._calibration_key
+
+    def cx_reliability(self, readout=False):
+        """
+        Args:
+            readout (bool): whether to include readout errors in cx reliability.
+
+        Returns:
+            numpy.ndarray: reliability of the cnot between every pair of qubits,
+                indexed by (control, target), 0 where there is no cnot.
+        """
+        if self.calibration is None:
+            self.calibration = Calibration.from_backend(self.backend_prop)
+        calibration = self.calibration
+        # calibration data may include qubits that are not in the coupling map
+        size = max(self.coupling_map.size(), calibration.size())
+        cx_reliab = np.zeros((size, size))
+        g_reliab = calibration.cx_reliability(readout, floor=10**(-10))
+        # a cnot sets both directions, the last calibrated one wins
+        control, target = calibration.cx_qubits[:, 0], calibration.cx_qubits[:, 1]
+        cx_reliab[np.stack([control, target], axis=1).ravel(),
+                  np.stack([target, control], axis=1).ravel()] = np.repeat(g_reliab, 2)
+        return cx_reliab
 
     def run(self, dag):
         """Sets the layout property set.
@@ -75,7 +135,7 @@ class ChainLayout(AnalysisPass):
         if num_dag_qubits > self.coupling_map.size():
             raise TranspilerError('Number of qubits greater than device.')
         # get the chain of qubits as list of integers
-        chain = self.chain(num_dag_qubits)
+        chain = self.cached_chain(num_dag_qubits)
         logger.info('Chain: %s' % str(chain))
         layout = Layout()
         chain_iter = 0
@@ -87,6 +147,64 @@ class ChainLayout(AnalysisPass):
         self.property_set['layout'] = layout
         logger.info(self.property_set['layout'])
 
+    def cached_chain(self, num_qubits):
+        """Looks for the chain in the in-memory cache shared by all instances, then in the on-disk cache,
+        and only finds it with chain() if it is not cached.
+        A chain only depends on the coupling map, the calibration data, the readout option,
+        the chain search and the number of qubits.
+        Reliability searches with a time limit or without a seed are not deterministic and are never cached.
+
+        Args:
+            num_qubits (int): number of virtual qubits.
+
+        Returns:
+            list: chain of qubits.
+        """
+        if self.search == 'greedy':
+            name = 'chain_greedy_%d' % num_qubits
+        elif self.time_limit is None and self.seed is not None:
+            name = 'chain_reliability_%d_%d_%d' % (self.seed, self.restarts, num_qubits)
+        else:
+            return self.chain(num_qubits)
+        calibration = self.cache_key()
+        key = (calibration, name)
+        if key in _chain_cache:
+            _chain_cache.move_to_end(key)
+            _chain_cache_stats['hits'] += 1
+            return list(_chain_cache[key])
+        chain = None
+        if self.cache_dir is not None:
+            arrays = load_arrays(self.cache_dir, calibration, (name,))
+            if arrays is not None:
+                chain = [int(q) for q in arrays[name]]
+                _chain_cache_stats['disk_hits'] += 1
+        if chain is None:
+            _chain_cache_stats['misses'] += 1
+            chain = self.chain(num_qubits)
+            if self.cache_dir is not None:
+                save_arrays(self.cache_dir, calibration, {name: np.array(chain, dtype=int)})
+        _chain_cache[key] = tuple(chain)
+        if len(_chain_cache) > CHAIN_CACHE_SIZE:
+            _chain_cache.popitem(last=False)
+        return chain
+
+    @staticmethod
+    def cache_info():
+        """
+        Returns:
+            ChainCacheInfo: hits of the in-memory and of the on-disk chain cache, misses,
+                maximum and current number of chains in memory.
+        """
+        return ChainCacheInfo(_chain_cache_stats['hits'], _chain_cache_stats['disk_hits'],
+                              _chain_cache_stats['misses'], CHAIN_CACHE_SIZE, len(_chain_cache))
+
+    @staticmethod
+    def cache_clear():
+        """Empties the in-memory chain cache and resets its statistics."""
+        _chain_cache.clear()
+        for stat in _chain_cache_stats:
+            _chain_cache_stats[stat] = 0
+
     def chain(self, num_qubits=None):
         """Finds a chain  of qubits such that qubit *i* has a connection
         with qubits *(i-1)* and *(i+1)* in the coupling chain.
@@ -105,6 +223,8 @@ class ChainLayout(AnalysisPass):
             num_qubits = self.coupling_map.size()
         if num_qubits > self.coupling_map.size():
             raise TranspilerError('Number of qubits greater than device.')
+        if self.search == 'reliability':
+            return self.reliable_chain(num_qubits)
 
         current = 0
         full_map = [current]
@@ -233,6 +353,25 @@ class ChainLayout(AnalysisPass):
                         break
         return full_map
 
+    def reliable_chain(self, num_qubits):
+        """Searches for a long chain of qubits with reliable links, see ChainSearch.
+        Relies on best_subset() to select the most reliable subset of the chain.
+        If the chain is too short, the remaining qubits are inserted after one of their neighbors.
+
+        Args:
+            num_qubits (int): number of virtual qubits.
+
+        Returns:
+            list: chain of `num_qubits` qubits.
+        """
+        cx_reliab = self.cx_reliab if self.backend_prop is not None else None
+        search = ChainSearch(self.coupling_graph, cx_reliab, seed=self.seed, restarts=self.restarts)
+        chain = search.search(num_qubits, self.time_limit)
+        logger.debug('Searched chain: %s', chain)
+        if len(chain) >= num_qubits:
+            return self.best_subset(chain, num_qubits)
+        return search.extend(chain, num_qubits)
+
     def check_isolated_not_last(self, q, explored):
         isolated = True
         for n in self.coupling_graph[q].keys():
@@ -243,6 +382,11 @@ class ChainLayout(AnalysisPass):
     def best_subset(self, chain, num_qubits):
         """Selects from the chain a subset of qubits with high cx reliability.
 
+        Every link between consecutive qubits of the chain is scored once, by the log of its cx reliability,
+        or by the distance between the qubits if no backend information are provided.
+        Qubits that are not adjacent are linked by the swaps along the shortest path between them.
+        Every window of the chain is then scored at once by differences of the prefix sums of the link scores.
+
         Args:
             chain (list): a chain of qubits.
             num_qubits (int): dimension of the subset.
@@ -250,40 +394,27 @@ class ChainLayout(AnalysisPass):
         Returns:
             best_subset (list): subset with high cx reliability.
         """
-        if self.backend_prop is None:
-            best_reliab = float('inf')
-        else:
-            best_reliab = 0
-        best = None
         if len(chain) - num_qubits == 0:
             return chain
-        # use a moving window over the chain to select a subset with high cx reliability
-        # if no backend information are provided, use the distance between qubits as a metric
-        for offset in range(len(chain) - num_qubits):
-            sub_set = chain[offset:offset + num_qubits]
-            if self.backend_prop is None:
-                tot_reliab = 0
-            else:
-                tot_reliab = 1
-            for q in range(len(sub_set) - 1):
-                if sub_set[q + 1] not in self.coupling_graph[q].keys():
-                    path = shortest_path(self.coupling_graph, source=sub_set[q], target=sub_set[q + 1])
-                    for p in range(len(path) - 1):
-                        if self.backend_prop is None:
-                            tot_reliab += 1
-                        else:
-                            tot_reliab *= self.cx_reliab[(path[p], path[p + 1])] ** 3
+        chain = list(chain)
+        if self.backend_prop is None:
+            link_scores = np.ones(len(chain) - 1)
+        else:
+            log_reliab = self._log_cx_reliab
+            link_scores = log_reliab[chain[:-1], chain[1:]]
+        for q in range(len(chain) - 1):
+            if chain[q + 1] not in self.coupling_graph[chain[q]]:
+                path = shortest_path(self.coupling_graph, source=chain[q], target=chain[q + 1])
+                if self.backend_prop is None:
+                    link_scores[q] = len(path) - 1
                 else:
-                    if self.backend_prop is None:
-                        tot_reliab += 1
-                    else:
-                        tot_reliab *= self.cx_reliab[(sub_set[q], sub_set[q + 1])]
-            if self.backend_prop is None:
-                if tot_reliab < best_reliab:
-                    best_reliab = tot_reliab
-                    best = sub_set
-            else:
-                if tot_reliab > best_reliab:
-                    best_reliab = tot_reliab
-                    best = sub_set
-        return best
+                    # a swap is made of three cnots
+                    link_scores[q] = 3 * log_reliab[path[:-1], path[1:]].sum()
+        prefix = np.concatenate(([0.0], np.cumsum(link_scores)))
+        # score of the window starting at every offset
+        window_scores = prefix[num_qubits - 1:] - prefix[:len(chain) - num_qubits + 1]
+        if self.backend_prop is None:
+            offset = int(np.argmin(window_scores))
+        else:
+            offset = int(np.argmax(window_scores))
+        return chain[offset:offset + num_qubits]
@@ -0,0 +1,166 @@
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ChainSearch:
+    """
+    Searches the coupling graph for a long chain of qubits with reliable links,
+    i.e. a path where every qubit is adjacent to the next one.
+
+    Chains are grown from both sides of a starting qubit following Warnsdorff's rule:
+    the next qubit is the unvisited neighbor with the fewest unvisited neighbors, so that
+    qubits with few links are visited before they get stranded, and ties are broken by
+    the reliability of the link. Neighbors with no unvisited neighbors end the chain,
+    so they are only taken when there is nothing else.
+    A first chain is grown from every qubit, then restarts from random qubits perturb the link
+    reliabilities with seeded noise, until the number of restarts or the time limit is reached.
+    """
+
+    def __init__(self, coupling_graph, cx_reliab=None, seed=0, restarts=200):
+        """ChainSearch initializer.
+
+        Args:
+            coupling_graph (networkx.Graph): undirected coupling graph.
+            cx_reliab (numpy.ndarray): reliability of the cnot between every pair of qubits,
+                default is None (all links are equally reliable).
+            seed (int): seed of the random restarts, default is 0.
+            restarts (int): number of random restarts after the first chain from every qubit.
+        """
+        self._qubits = sorted(coupling_graph.nodes)
+        self._size = max(self._qubits) + 1 if self._qubits else 0
+        self._neighbors = [[] for _ in range(self._size)]
+        self._weights = [[] for _ in range(self._size)]
+        if cx_reliab is not None:
+            log_reliab = np.log(np.maximum(cx_reliab, np.finfo(float).tiny))
+        for q in self._qubits:
+            for n in sorted(coupling_graph[q]):
+                self._neighbors[q].append(n)
+                self._weights[q].append(float(log_reliab[q, n]) if cx_reliab is not None else 0.0)
+        self._degree = [len(neighbors) for neighbors in self._neighbors]
+        weights = [w for qubit_weights in self._weights for w in qubit_weights]
+        # noise in the order of the spread of the link reliabilities, or a random tie break
+        self._noise = float(np.std(weights)) if weights and np.std(weights) > 0 else 1.0
+        self._weighted = cx_reliab is not None
+        self._rng = np.random.RandomState(seed)
+        self._restarts = restarts
+
+    def search(self, num_qubits, time_limit=None):
+        """Searches for a chain with at least `num_qubits` qubits and the most reliable window
+        of `num_qubits` consecutive qubits, or else for the longest chain.
+
+        Args:
+            num_qubits (int): number of virtual qubits.
+            time_limit (float): seconds after which the best chain found so far is returned,
+                default is None (no limit).
+
+        Returns:
+            list: the best chain found.
+        """
+        start_time = time.time()
+        starts = [(q, False) for q in self._qubits]
+        starts += [(self._qubits[self._rng.randint(len(self._qubits))], True) for _ in range(self._restarts)]
+        best = []
+        best_score = None
+        for walks, (start, noise) in enumerate(starts):
+            chain = self.walk(start, noise)
+            score = self.score(chain, num_qubits)
+            if best_score is None or score > best_score:
+                best = chain
+                best_score = score
+            # without calibration data every chain long enough is as good
+            if not self._weighted and len(best) >= num_qubits:
+                break
+            if time_limit is not None and time.time() - start_time > time_limit:
+                logger.info('Chain search stopped after %d chains', walks + 1)
+                break
+        return best
+
+    def walk(self, start, noise=False):
+        """Grows a chain from both sides of a qubit.
+
+        Args:
+            start (int): starting qubit.
+            noise (bool): whether to perturb the link reliabilities.
+
+        Returns:
+            list: the chain.
+        """
+        visited = bytearray(self._size)
+        degree = list(self._degree)
+
+        def visit(q):
+            visited[q] = 1
+            for n in self._neighbors[q]:
+                degree[n] -= 1
+
+        visit(start)
+        sides = []
+        for _ in range(2):
+            side = []
+            current = start
+            while True:
+                next = None
+                next_key = None
+                for n, w in zip(self._neighbors[current], self._weights[current]):
+                    if visited[n]:
+                        continue
+                    if noise:
+                        w += self._rng.normal(0, self._noise)
+                    key = (degree[n] if degree[n] > 0 else self._size, -w)
+                    if next_key is None or key < next_key:
+                        next = n
+                        next_key = key
+                if next is None:
+                    break
+                visit(next)
+                side.append(next)
+                current = next
+            sides.append(side)
+        return sides[1][::-1] + [start] + sides[0]
+
+    def score(self, chain, num_qubits):
+        """
+        Args:
+            chain (list): a chain of qubits.
+            num_qubits (int): number of virtual qubits.
+
+        Returns:
+            tuple: the number of qubits of the chain up to `num_qubits`, and the log-reliability
+                of its best window of `num_qubits` qubits, or of the whole chain if shorter.
+        """
+        links = [self._weights[a][self._neighbors[a].index(b)] for a, b in zip(chain[:-1], chain[1:])]
+        prefix = np.concatenate(([0.0], np.cumsum(links)))
+        if len(chain) < num_qubits:
+            return len(chain), prefix[-1]
+        return num_qubits, float(np.max(prefix[num_qubits - 1:] - prefix[:len(chain) - num_qubits + 1]))
+
+    def extend(self, chain, num_qubits):
+        """Inserts qubits that are not in the chain after one of their neighbors,
+        choosing every time the most reliable link, until the chain has `num_qubits` qubits.
+
+        Args:
+            chain (list): a chain of qubits.
+            num_qubits (int): number of virtual qubits.
+
+        Returns:
+            list: the extended chain.
+        """
+        chain = list(chain)
+        in_chain = set(chain)
+        while len(chain) < num_qubits:
+            best = None
+            for q in chain:
+                for n, w in zip(self._neighbors[q], self._weights[q]):
+                    if n not in in_chain and (best is None or w > best[0]):
+                        best = (w, q, n)
+            if best is None:
+                # the coupling graph is not connected
+                best = (None, chain[-1], min(q for q in self._qubits if q not in in_chain))
+            _, q, n = best
+            chain.insert(chain.index(q) + 1, n)
+            in_chain.add(n)
+        return chain
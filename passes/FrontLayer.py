@@ -0,0 +1,266 @@
+import heapq
+from array import array
+
+import numpy as np
+
+# directives are executed as soon as their qubits are free, wherever the qubits are
+DIRECTIVES = ("barrier", "snapshot", "save", "load", "noise")
+
+
+class FrontLayer:
+    """
+    Front layer of the gates of a circuit that still have to be routed.
+
+    Gates are numbered by their position in a topological order of the circuit.
+    Every gate is linked to the gates that precede and follow it on each of its qubits and bits.
+    A gate is ready when all its predecessors have been executed. Ready gates are executed
+    as soon as the layout allows it, remote two-qubit gates are kept in the front layer.
+    Executing a gate only inspects its successors, and every change to the state is logged,
+    so that search branches can advance the front layer and then undo their changes.
+    Gates that have not been executed are kept in a doubly linked list in gate order,
+    so that looking ahead only visits them, however many gates have been executed.
+    """
+
+    def __init__(self, gates, qubit_index, coupling_map, sorted_front=False):
+        """FrontLayer initializer.
+
+        Args:
+            gates (list): op nodes of the circuit in topological order.
+            qubit_index (dict): index of every virtual qubit.
+            coupling_map (CouplingMap): the device coupling map.
+            sorted_front (bool): if True the front layer is kept in gate order,
+                otherwise gates that stay in the front layer precede the newly ready ones.
+        """
+        num_gates = len(gates)
+        self._sorted_front = sorted_front
+        self._edges = set()
+        for i, j in coupling_map.get_edges():
+            self._edges.add((i, j))
+            self._edges.add((j, i))
+
+        self._qubits = []
+        self._two_qubit = bytearray(num_gates)
+        self._done = bytearray(num_gates)
+        preds = []
+        last_gate = {}
+        for index, gate in enumerate(gates):
+            self._qubits.append(tuple(qubit_index[q] for q in gate.qargs))
+            if gate.name in DIRECTIVES:
+                if not gate.qargs:
+                    # nothing to route, the directive is dropped
+                    self._done[index] = 1
+            elif len(gate.qargs) == 2:
+                self._two_qubit[index] = 1
+            wires = list(gate.qargs) + list(gate.cargs)
+            if gate.condition is not None:
+                wires.extend(gate.condition[0])
+            gate_preds = []
+            for wire in wires:
+                pred = last_gate.get(wire)
+                if pred is not None and pred not in gate_preds:
+                    gate_preds.append(pred)
+                last_gate[wire] = index
+            preds.append(gate_preds)
+
+        succs = [[] for _ in range(num_gates)]
+        for index, gate_preds in enumerate(preds):
+            for pred in gate_preds:
+                succs[pred].append(index)
+        self._pred_start, self._preds = self._flatten(preds)
+        self._succ_start, self._succs = self._flatten(succs)
+
+        self.front = []
+        self._pending = [index for index in range(num_gates) if not preds[index] and not self._done[index]]
+        # links of the gates not executed yet, num_gates is both the head and the tail of the list
+        self._next = array('i', [num_gates]) * (num_gates + 1)
+        self._prev = array('i', [num_gates]) * (num_gates + 1)
+        self._link_pending()
+        self._log = array('i')
+
+    @staticmethod
+    def _flatten(lists):
+        start = array('i', [0])
+        flat = array('i')
+        for items in lists:
+            flat.extend(items)
+            start.append(len(flat))
+        return start, flat
+
+    def qubits(self, gate):
+        """
+        Args:
+            gate (int): gate index.
+
+        Returns:
+            tuple: virtual qubits of the gate.
+        """
+        return self._qubits[gate]
+
+    def finished(self):
+        """
+        Returns:
+            bool: True if all the gates have been executed.
+        """
+        return self._next[-1] == len(self._done)
+
+    def advance(self, layout, executed=None):
+        """Executes all the ready gates allowed by `layout`.
+
+        Args:
+            layout (IntLayout): the current layout.
+            executed (list): if given, the executed gates are appended to it
+                as (gate index, physical qargs), in execution order.
+        """
+        two_qubit = self._two_qubit
+        qubits = self._qubits
+        edges = self._edges
+
+        ready = self._pending
+        self._pending = []
+        front = []
+        if self._sorted_front:
+            ready.extend(self.front)
+        else:
+            # the gates of the front layer are examined first, in their order
+            for gate in self.front:
+                if two_qubit[gate] and (layout[qubits[gate][0]], layout[qubits[gate][1]]) not in edges:
+                    front.append(gate)
+                else:
+                    ready.extend(self._execute(gate, layout, executed))
+        heapq.heapify(ready)
+        # ready gates are visited in gate order, a gate is always ready after its predecessors
+        while ready:
+            gate = heapq.heappop(ready)
+            if two_qubit[gate] and (layout[qubits[gate][0]], layout[qubits[gate][1]]) not in edges:
+                front.append(gate)
+                continue
+            for succ in self._execute(gate, layout, executed):
+                heapq.heappush(ready, succ)
+        self.front = front
+
+    def _execute(self, gate, layout, executed):
+        done = self._done
+        preds, pred_start = self._preds, self._pred_start
+        done[gate] = 1
+        self._log.append(gate)
+        # unlink the gate, its own links are kept to relink it on undo
+        self._next[self._prev[gate]] = self._next[gate]
+        self._prev[self._next[gate]] = self._prev[gate]
+        if executed is not None:
+            executed.append((gate, tuple(layout[q] for q in self._qubits[gate])))
+        unlocked = []
+        for i in range(self._succ_start[gate], self._succ_start[gate + 1]):
+            succ = self._succs[i]
+            if all(done[preds[j]] for j in range(pred_start[succ], pred_start[succ + 1])):
+                unlocked.append(succ)
+        return unlocked
+
+    def _link_pending(self):
+        """Links the gates that have not been executed, in gate order."""
+        head = len(self._done)
+        pending = np.flatnonzero(self.executed_flags() == 0) if head else []
+        gates = np.concatenate(([head], pending)).astype(np.intc)
+        np.frombuffer(self._next, dtype=np.intc)[gates] = np.roll(gates, -1)
+        np.frombuffer(self._prev, dtype=np.intc)[gates] = np.roll(gates, 1)
+
+    def checkpoint(self):
+        """
+        Returns:
+            tuple: the current state, to be restored with undo().
+        """
+        return len(self._log), list(self.front), list(self._pending)
+
+    def undo(self, checkpoint):
+        """Restores a state saved by checkpoint().
+
+        Args:
+            checkpoint (tuple): the state to restore.
+        """
+        log_length, self.front, self._pending = checkpoint
+        next, prev = self._next, self._prev
+        # relink the gates in the reverse order of their execution
+        for i in range(len(self._log) - 1, log_length - 1, -1):
+            gate = self._log[i]
+            self._done[gate] = 0
+            next[prev[gate]] = gate
+            prev[next[gate]] = gate
+        del self._log[log_length:]
+
+    def state(self):
+        """
+        Returns:
+            tuple: the front layer and the ready gates not yet examined,
+                to be restored with restore() together with the executed flags.
+        """
+        return list(self.front), list(self._pending)
+
+    def executed_flags(self):
+        """
+        Returns:
+            numpy.ndarray: view of the executed flag of every gate.
+        """
+        return np.frombuffer(self._done, dtype=np.uint8)
+
+    def restore(self, executed, state):
+        """Restores the state of another front layer of the same circuit.
+
+        Args:
+            executed (numpy.ndarray): executed flag of every gate.
+            state (tuple): the state returned by state().
+        """
+        self.executed_flags()[:] = executed
+        front, pending = state
+        self.front = list(front)
+        self._pending = list(pending)
+        self._link_pending()
+        del self._log[:]
+
+    def key(self):
+        """
+        Returns:
+            tuple: hashable snapshot of the state, once all the ready gates have been
+                examined the front layer determines which gates have been executed.
+        """
+        return tuple(self.front), tuple(self._pending)
+
+    def pending_pairs(self, next_gates):
+        """
+
+        Args:
+            next_gates (int): number of following two-qubit gates.
+
+        Returns:
+            (tuple):
+                pairs (numpy.ndarray): virtual qubits of the remote gates of the front layer
+                    and of the following `next_gates` two-qubit gates.
+                n_reliab (int): number of leading pairs used to score the reliability,
+                    the following two-qubit gates found within the first `next_gates` gates.
+        """
+        two_qubit = self._two_qubit
+        next = self._next
+        head = len(self._done)
+        if self._sorted_front:
+            pairs = []
+            skip = ()
+        else:
+            pairs = [self._qubits[gate] for gate in self.front]
+            skip = set(self.front)
+        n_front = len(pairs)
+        n_reliab = n_front
+        i = -1
+        gate = head
+        while True:
+            gate = next[gate]
+            if gate == head:
+                break
+            if gate in skip:
+                continue
+            i += 1
+            if two_qubit[gate]:
+                pairs.append(self._qubits[gate])
+                if i < next_gates:
+                    n_reliab += 1
+                if len(pairs) - n_front == next_gates:
+                    break
+
+        return np.array(pairs, dtype=int).reshape(-1, 2), n_reliab
@@ -0,0 +1,112 @@
+from array import array
+
+import numpy as np
+
+from qiskit.transpiler import Layout
+
+
+class IntLayout:
+    """
+    Compact layout used by the routing passes in their inner loops.
+
+    Virtual qubits are numbered by their position in the circuit register, physical qubits
+    by their index in the coupling map. The mapping is kept in two integer permutation
+    vectors (virtual to physical and physical to virtual), so that a swap is applied in place
+    in constant time and is undone by applying the same swap again.
+    """
+
+    def __init__(self, virtual_to_physical, num_physical):
+        """IntLayout initializer.
+
+        Args:
+            virtual_to_physical (list): physical qubit of every virtual qubit.
+            num_physical (int): number of physical qubits, unmapped ones are marked with -1.
+        """
+        self._v2p = array('i', virtual_to_physical)
+        self._p2v = array('i', [-1]) * num_physical
+        for v, p in enumerate(self._v2p):
+            self._p2v[p] = v
+        self._v2p_array = np.frombuffer(self._v2p, dtype=np.intc)
+
+    @classmethod
+    def from_layout(cls, layout, virtual_qubits, num_physical):
+        """
+        Args:
+            layout (Layout): a qiskit layout.
+            virtual_qubits (list): virtual qubits in register order.
+            num_physical (int): number of physical qubits.
+
+        Returns:
+            IntLayout: the equivalent integer layout.
+        """
+        return cls([layout[q] for q in virtual_qubits], num_physical)
+
+    def to_layout(self, virtual_qubits):
+        """
+        Args:
+            virtual_qubits (list): virtual qubits in register order.
+
+        Returns:
+            Layout: the equivalent qiskit layout.
+        """
+        layout = Layout()
+        for v, q in enumerate(virtual_qubits):
+            layout[q] = self._v2p[v]
+        return layout
+
+    def __getitem__(self, virtual):
+        return self._v2p[virtual]
+
+    def __len__(self):
+        return len(self._v2p)
+
+    def to_physical(self, virtual):
+        """
+        Args:
+            virtual (numpy.ndarray): array of virtual qubits.
+
+        Returns:
+            numpy.ndarray: physical qubits of `virtual`, with the same shape.
+        """
+        return self._v2p_array[virtual]
+
+    def virtual(self, physical):
+        """
+        Args:
+            physical (int): physical qubit.
+
+        Returns:
+            int: virtual qubit mapped to `physical`, -1 if none.
+        """
+        return self._p2v[physical]
+
+    def swap(self, physical1, physical2):
+        """Swaps in place the virtual qubits mapped to two physical qubits.
+
+        Args:
+            physical1 (int): first physical qubit.
+            physical2 (int): second physical qubit.
+        """
+        p2v = self._p2v
+        v1 = p2v[physical1]
+        v2 = p2v[physical2]
+        p2v[physical1] = v2
+        p2v[physical2] = v1
+        if v1 >= 0:
+            self._v2p[v1] = physical2
+        if v2 >= 0:
+            self._v2p[v2] = physical1
+
+    def key(self):
+        """
+        Returns:
+            bytes: hashable snapshot of the permutation.
+        """
+        return self._v2p.tobytes()
+
+    def copy(self):
+        new_layout = IntLayout.__new__(IntLayout)
+        new_layout._v2p = array('i', self._v2p)
+        new_layout._p2v = array('i', self._p2v)
+        new_layout._v2p_array = np.frombuffer(new_layout._v2p, dtype=np.intc)
+        return new_layout
@@ -1,16 +1,26 @@
 import logging
-import math
-from copy import deepcopy
-from functools import reduce
+from copy import copy, deepcopy
+from multiprocessing import Pool, RawArray
 
-import networkx as nx
+import numpy as np
 
 from qiskit.dagcircuit import DAGCircuit, DAGNode
 from qiskit.extensions import SwapGate
 from qiskit.transpiler import TransformationPass, TranspilerError, Layout, CouplingMap
 
+from .FrontLayer import FrontLayer
+from .IntLayout import IntLayout
+from .Calibration import Calibration
+from .RoutingTables import RoutingTables, calibration_key, swap_cost
+
 logger = logging.getLogger(__name__)
 
+# attributes needed by the search in worker processes
+_WORKER_ATTRIBUTES = ('_search_depth', '_n_swaps', '_next_gates', '_alpha', '_front', '_beam_width',
+                      '_coupling_map', '_coupling_graph', '_max_distance')
+# search state of a worker process
+_worker_pass = None
+
 
 class NoiseAdaptiveSwap(TransformationPass):
 
@@ -20,11 +30,17 @@ class NoiseAdaptiveSwap(TransformationPass):
 
         Args:
             coupling_map (CouplingMap or list): Directed graph or list representing a coupling map.
-            backend_prop (qiskit.providers.models.BackendProperties):
+            backend_prop (qiskit.providers.models.BackendProperties or Calibration):
         Keyword Args:
             search_depth (int): next layout search depth, default is 4.
             n_swaps (int): possible swaps considered in each layout, default is 4.
             next_gates (int): number of following gates used to score possible swaps, default is 10.
+            beam_width (int): number of best scored swaps expanded at each search level,
+                default is None (expand all possible swaps).
+            cache_dir (str): directory where the routing tables of each calibration are cached,
+                default is None (no cache).
+            workers (int): number of processes searching the subtrees of the first level swaps,
+                default is 1 (serial search).
         Raises:
             TranspilerError: if invalid options.
         """
@@ -53,8 +69,31 @@ class NoiseAdaptiveSwap(TransformationPass):
             self._front = kwargs['front']
         else:
             self._front = False
+        if 'beam_width' in kwargs:
+            self._beam_width = kwargs['beam_width']
+        else:
+            self._beam_width = None
+        if self._beam_width is not None and self._beam_width < 1:
+            raise TranspilerError('Invalid option for search beam width.')
+        if 'cache_dir' in kwargs:
+            self._cache_dir = kwargs['cache_dir']
+        else:
+            self._cache_dir = None
+        if 'workers' in kwargs:
+            self._workers = kwargs['workers']
+        else:
+            self._workers = 1
+        if self._workers < 1:
+            raise TranspilerError('Invalid option for the number of workers.')
 
         self._qreg = None
+        self._virtual_qubits = None
+        self._virtual_index = None
+        self._front_layer = None
+        self._pool = None
+        self._shared_executed = None
+        self._search_cache = None
+        self._cache_hits = 0
         if isinstance(coupling_map, list):
             self._coupling_map = CouplingMap(couplinglist=coupling_map)
         elif isinstance(coupling_map, CouplingMap):
@@ -63,83 +102,40 @@ class NoiseAdaptiveSwap(TransformationPass):
             raise TranspilerError('Coupling map of type %s is not a valid option.' % coupling_map.__class__)
         self._coupling_graph = self._coupling_map.graph.to_undirected()
 
-        p, distances = nx.algorithms.shortest_paths.dense.floyd_warshall_predecessor_and_distance(self._coupling_graph)
-        self._max_distance = 0
-        for x in distances:
-            for y in distances[x]:
-                if distances[x][y] > self._max_distance:
-                    self._max_distance = distances[x][y]
-        p.clear()
-        distances.clear()
-
         self.backend_prop = backend_prop
-        self.swap_graph = nx.DiGraph()
-        self.cx_reliability = {}
-        self.swap_reliabs = {}
-
-        if self._readout:
-            self._readout_reliability = dict()
-            i = 0
-            for q in backend_prop.qubits:
-                for info in q:
-                    if info.name == 'readout_error':
-                        self._readout_reliability[i] = 1.0 - info.value
-                        i += 1
-            #print(self._readout_reliability)
-
-        backend_prop = self.backend_prop
-        for ginfo in backend_prop.gates:
-            if ginfo.gate == 'cx':
-                for item in ginfo.parameters:
-                    if item.name == 'gate_error':
-                        g_reliab = 1.0 - item.value
-                        break
-                    else:
-                        g_reliab = 1.0
-                swap_reliab = pow(g_reliab, 3)
-                # convert swap reliability to edge weight
-                # for the Floyd-Warshall shortest weighted paths algorithm
-                swap_cost = -math.log(swap_reliab) if swap_reliab != 0 else 10**(-10)
-                self.swap_graph.add_edge(ginfo.qubits[0], ginfo.qubits[1], weight=swap_cost)
-                self.swap_graph.add_edge(ginfo.qubits[1], ginfo.qubits[0], weight=swap_cost)
-                self.cx_reliability[(ginfo.qubits[0], ginfo.qubits[1])] = g_reliab
-                if self._readout:
-                    qubits_readout_reliab = self._readout_reliability[ginfo.qubits[0]] * self._readout_reliability[
-                        ginfo.qubits[1]]
-                    self.cx_reliability[(ginfo.qubits[0], ginfo.qubits[1])] *= qubits_readout_reliab
-
-        self.swap_paths, swap_reliabs_temp = nx.algorithms.shortest_paths.dense. \
-            floyd_warshall_predecessor_and_distance(self.swap_graph, weight='weight')
-        for i in swap_reliabs_temp:
-            self.swap_reliabs[i] = {}
-            for j in swap_reliabs_temp[i]:
-                if (i, j) in self.cx_reliability:
-                    self.swap_reliabs[i][j] = self.cx_reliability[(i, j)]
-                elif (j, i) in self.cx_reliability:
-                    self.swap_reliabs[i][j] = self.cx_reliability[(j, i)]
-                else:
-                    best_reliab = 0.0
-                    for n in self.swap_graph.neighbors(j):
-                        if (n, j) in self.cx_reliability:
-                            reliab = math.exp(-swap_reliabs_temp[i][n]) * self.cx_reliability[(n, j)]
-                        else:
-                            reliab = math.exp(-swap_reliabs_temp[i][n]) * self.cx_reliability[(j, n)]
-                        if reliab > best_reliab:
-                            best_reliab = reliab
-                    self.swap_reliabs[i][j] = best_reliab
-        min_reliab = 1.0
-        max_reliab = 0.0
-        for i in self.swap_reliabs:
-            for j in self.swap_reliabs[i]:
-                if self.swap_reliabs[i][j] < min_reliab:
-                    min_reliab = self.swap_reliabs[i][j]
-                if self.swap_reliabs[i][j] > max_reliab:
-                    max_reliab = self.swap_reliabs[i][j]
-
-        for i in self.swap_reliabs:
-            for j in self.swap_reliabs[i]:
-                self.swap_reliabs[i][j] = (self.swap_reliabs[i][j]-min_reliab)/(max_reliab-min_reliab)
-        logger.debug('Swap paths: %s' % str(self.swap_paths))
+        # parsed only if the routing tables are not in the cache
+        self.calibration = backend_prop if isinstance(backend_prop, Calibration) else None
+        tables = None
+        if self._cache_dir is not None:
+            key = calibration_key(self._coupling_map, backend_prop, self._readout)
+            tables = RoutingTables.load(self._cache_dir, key)
+        if tables is None:
+            tables = self.build_tables()
+            if self._cache_dir is not None:
+                tables.save(self._cache_dir, key)
+        self._distance_matrix = tables.distance
+        self._max_distance = tables.max_distance
+        self.swap_reliabs = tables.swap_reliab
+        self._next_hop = tables.next_hop
+        self._hop_next = tables.hop_next
+        self.cx_reliability = tables.cx_reliability
+        logger.debug('Swap paths: %s' % str(self._next_hop))
+
+    def build_tables(self):
+        """Builds the routing tables from the calibration data.
+
+        Returns:
+            RoutingTables: the routing tables of the backend.
+        """
+        if self.calibration is None:
+            self.calibration = Calibration.from_backend(self.backend_prop)
+        calibration = self.calibration
+        qubits = [tuple(edge) for edge in calibration.cx_qubits.tolist()]
+        swap_costs = {edge: swap_cost(g_reliab)
+                      for edge, g_reliab in zip(qubits, calibration.cx_reliability().tolist())}
+        cx_reliability = dict(zip(qubits, calibration.cx_reliability(self._readout).tolist()))
+
+        return RoutingTables.build(self._coupling_map, cx_reliability, swap_costs)
 
     def run(self, dag):
         """
@@ -169,243 +165,275 @@ class NoiseAdaptiveSwap(TransformationPass):
         for c_reg in dag.cregs.values():
             new_dag.add_creg(deepcopy(c_reg))
 
+        self._virtual_qubits = list(canonical_register)
+        self._virtual_index = {q: i for i, q in enumerate(self._virtual_qubits)}
         layout = Layout.generate_trivial_layout(canonical_register)
-        current_layout = layout.copy()
-
-        gates = [[n for n in gate['graph'].nodes() if n.type == 'op'][0] for gate in dag.serial_layers()]
-
-        executed = []
-        to_execute = gates.copy()
-
-        if self._front:
-            to_execute, to_map, executed = self.update_to_map([], current_layout, to_execute)
-            while to_map:
-                #print('Searching Layout')
-                next_step = self.search_layout(to_map, current_layout, to_execute, iter=self._search_depth)
+        current_layout = IntLayout.from_layout(layout, self._virtual_qubits, self._coupling_map.size())
+
+        gates = list(dag.topological_op_nodes())
+        self._front_layer = FrontLayer(gates, self._virtual_index, self._coupling_map,
+                                       sorted_front=not self._front)
+
+        if self._workers > 1:
+            self._start_pool()
+        try:
+            executed = []
+            self._front_layer.advance(current_layout, executed)
+            while not self._front_layer.finished():
+                next_step = self.search_layout(current_layout, iter=self._search_depth)
                 logger.info('Next step: %s' % str(next_step))
-                current_layout = next_step['layout']
-                to_map = next_step['to_map']
-                to_execute = next_step['to_execute']
-                executed.extend(next_step['executed'])
-        else:
-            while to_execute:
-                next_step = self.search_layout([], current_layout, to_execute, iter=self._search_depth)
-                logger.info('Next step: %s' % str(next_step))
-                current_layout = next_step['layout']
-                to_execute = next_step['to_execute']
-                executed.extend(next_step['executed'])
-
-        for gate in executed:
-            new_dag.apply_operation_back(gate.op, gate.qargs, gate.cargs, gate.condition)
-
-        return new_dag
-
-    def update_to_map(self, to_map, layout, gates):
-        busy = set()
-        executed = []
-        to_execute = []
-        temp = to_map.copy()
-        temp.extend(gates)
-        to_map = []
-        for gate in temp:
-            qargs = gate.qargs
-
-            if gate.name in ["barrier", "snapshot", "save", "load", "noise"]:
-                if not qargs:
-                    continue
-                if busy.intersection(qargs):
-                    busy.update(qargs)
-                    to_execute.append(gate)
-                else:
-                    executed.append(self.execute_gate(gate, layout))
-                continue
-
-            if not busy.intersection(qargs):
-                if len(qargs) == 1:
-                    executed.append(self.execute_gate(gate, layout))
-                elif self._coupling_map.distance(*[layout[q] for q in qargs]) == 1:
-                    logger.debug('Executed two-qubit gate with qargs: %s\n' % gate.qargs)
-                    executed.append(self.execute_gate(gate, layout))
-                else:
-                    logger.debug('Remote gate with qargs: %s\n' % gate.qargs)
-                    to_map.append(gate)
-                    busy.update(qargs)
+                # replay the chosen swaps
+                for swap in next_step['swaps']:
+                    current_layout.swap(*swap)
+                    executed.append(self.execute_swap_gate(swap))
+                    self._front_layer.advance(current_layout, executed)
+        finally:
+            if self._pool is not None:
+                self._stop_pool()
+        self._front_layer = None
+
+        # materialize the executed gates of the chosen path
+        for gate_id, phys_qargs in executed:
+            qargs = [self._qreg[q] for q in phys_qargs]
+            if gate_id is None:
+                new_dag.apply_operation_back(SwapGate(), qargs, [])
             else:
-                to_execute.append(gate)
-                busy.update(qargs)
+                gate = gates[gate_id]
+                new_dag.apply_operation_back(copy(gate.op), qargs, gate.cargs, gate.condition)
+        self.property_set['final_layout'] = current_layout.to_layout(self._virtual_qubits)
 
-        return to_execute, to_map, executed
+        return new_dag
 
-    def search_layout(self, to_map, layout, gates, iter=4, last_swap=None):
+    def search_layout(self, layout, iter=4, last_swap=None):
         """
+        Searches the best sequence of swaps, up to `iter` swaps deep.
+
+        Search states are cached by layout permutation and front layer,
+        so subtrees reached by different swap orders are only explored once.
+        At each level only the best `beam_width` swaps are expanded.
 
         Args:
-            layout (Layout): the current layout.
-            gates (list): gates to be executed.
+            layout (IntLayout): the current layout, restored before returning.
             iter (int): number of consecutive swaps to search before returning a solution.
+            last_swap (list): last swap applied to the layout.
 
         Returns:
             (dict): the solution found.
-                to_execute (list): gates that could not be executed.
-                executed (list): gates executed.
-                score (tuple): score of the solution as (# of executed gates, reliability of inserted swaps).
-                layout (Layout): layout of the solution.
+                score (float): reliability score of the inserted swaps.
+                swaps (list): swaps leading from `layout` to the layout of the solution.
         """
-        if self._front:
-            to_execute, to_map, executed = self.update_to_map(to_map, layout, gates)
+        self._search_cache = {}
+        self._cache_hits = 0
+        if self._pool is not None:
+            best_step = self._search_parallel(layout, iter, last_swap)
         else:
-            to_execute, to_map, executed = self.update_to_execute(gates, layout)
-
-        current_step = {
-            'to_map': to_map,
-            'to_execute': to_execute,
-            'executed': executed,
-            'score': 1,
-            'layout': layout,
-            'swaps': last_swap
-        }
+            best_step = self._search(layout, iter, last_swap)
+        logger.debug('Search states: %d, cache hits: %d' % (len(self._search_cache), self._cache_hits))
+        self._search_cache = None
+        return best_step
 
-        if iter == 0 or not to_map:
+    def _search(self, layout, iter, last_swap):
+        key = self._search_key(layout, iter, last_swap)
+        if key in self._search_cache:
+            self._cache_hits += 1
+            return self._search_cache[key]
+
+        front_layer = self._front_layer
+        checkpoint = front_layer.checkpoint()
+        front_layer.advance(layout)
+
+        if iter == 0 or not front_layer.front:
+            current_step = {
+                'score': 1,
+                'swaps': []
+            }
+            front_layer.undo(checkpoint)
+            self._search_cache[key] = current_step
             return current_step
 
-        if self._front:
-            possible_swaps = self.new_possible_swaps(to_map, layout, to_execute, last_swap=last_swap)
-        else:
-            possible_swaps = self.possible_swaps(to_map[0], layout, to_execute, n=self._n_swaps)
+        possible_swaps = self._candidate_swaps(layout, last_swap)
 
-        next_swap, best_step = None, None
+        next_swap, best_step, best_score = None, None, None
         for swap in possible_swaps:
-            current_layout = layout.copy()
-            current_layout.swap(*swap['swap'])
-
-            if self._front:
-                next_step = self.search_layout(to_map, current_layout, to_execute, iter - 1, last_swap=swap['swap'])
-            else:
-                next_step = self.search_layout([], current_layout, to_execute, iter - 1, last_swap=swap['swap'])
+            layout.swap(*swap['swap'])
+            next_step = self._search(layout, iter - 1, swap['swap'])
+            layout.swap(*swap['swap'])
 
-            next_step['score'] = (swap['score']*next_step['score'])
-            if next_swap is None or next_step['score'] > best_step['score']:
-                next_swap, best_step = swap, next_step
-
-        swap_gate = self.execute_swap_gate(next_swap)
+            score = swap['score'] * next_step['score']
+            if next_swap is None or score > best_score:
+                next_swap, best_step, best_score = swap, next_step, score
+        front_layer.undo(checkpoint)
 
         best_step = {
-            'to_map': best_step['to_map'],
-            'to_execute': best_step['to_execute'],
-            'executed': executed + [swap_gate] + best_step['executed'],
-            'score': best_step['score'],
-            'layout': best_step['layout']
+            'score': best_score,
+            'swaps': [next_swap['swap']] + best_step['swaps']
         }
+        self._search_cache[key] = best_step
 
         return best_step
 
-    def execute_swap_gate(self, swap):
+    def _search_parallel(self, layout, iter, last_swap):
         """
+        Same as _search(), the subtrees of the first level swaps are searched by the process pool.
+        """
+        front_layer = self._front_layer
+        checkpoint = front_layer.checkpoint()
+        front_layer.advance(layout)
+
+        if iter == 0 or not front_layer.front:
+            front_layer.undo(checkpoint)
+            return {
+                'score': 1,
+                'swaps': []
+            }
+
+        possible_swaps = self._candidate_swaps(layout, last_swap)
+        # workers start from the executed gates in shared memory and the state of the front layer
+        self._shared_executed[:] = front_layer.executed_flags()
+        state = front_layer.state()
+        tasks = []
+        for swap in possible_swaps:
+            layout.swap(*swap['swap'])
+            tasks.append((list(layout), state, iter - 1, swap['swap']))
+            layout.swap(*swap['swap'])
+        next_steps = self._pool.map(_search_subtree, tasks, chunksize=1)
+        front_layer.undo(checkpoint)
+
+        # same reduction as the serial search, ties go to the first swap
+        next_swap, best_step, best_score = None, None, None
+        for swap, next_step in zip(possible_swaps, next_steps):
+            score = swap['score'] * next_step['score']
+            if next_swap is None or score > best_score:
+                next_swap, best_step, best_score = swap, next_step, score
+
+        return {
+            'score': best_score,
+            'swaps': [next_swap['swap']] + best_step['swaps']
+        }
 
+    def _candidate_swaps(self, layout, last_swap):
+        """
         Args:
-            swap (dict): swap to be executed.
+            layout (IntLayout): the current layout.
+            last_swap (list): last swap applied to the layout.
 
         Returns:
-            swap_gate (Gate): executed swap gate.
+            possible_swaps (list): swaps expanded by the search, ranked by their score.
         """
+        if self._front:
+            possible_swaps = self.new_possible_swaps(layout, last_swap=last_swap)
+        else:
+            possible_swaps = self.possible_swaps(self._front_layer.front[0], layout, n=self._n_swaps)
+        if self._beam_width is not None:
+            possible_swaps = possible_swaps[:self._beam_width]
+        return possible_swaps
+
+    def _start_pool(self):
+        """Starts the worker processes, that receive the routing tables and the front layer
+        once, in shared memory when possible.
+        """
+        tables = [_share_array(table)
+                  for table in (self._distance_matrix, self.swap_reliabs, self._next_hop, self._hop_next)]
+        shared_executed = RawArray('B', self._front_layer.executed_flags().size)
+        self._shared_executed = np.frombuffer(shared_executed, dtype=np.uint8)
+        state = {name: getattr(self, name) for name in _WORKER_ATTRIBUTES}
+        self._pool = Pool(self._workers, initializer=_init_worker,
+                          initargs=(state, tables, self._front_layer, shared_executed))
+
+    def _stop_pool(self):
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        self._shared_executed = None
+
+    def search_subtree(self, virtual_to_physical, state, iter, last_swap):
+        """
+        Searches the best sequence of swaps in a worker process.
+
+        Args:
+            virtual_to_physical (list): physical qubit of every virtual qubit.
+            state (tuple): state of the front layer, see FrontLayer.state().
+            iter (int): number of consecutive swaps to search before returning a solution.
+            last_swap (list): last swap applied to the layout.
+
+        Returns:
+            (dict): the solution found, see search_layout().
+        """
+        self._front_layer.restore(self._shared_executed, state)
+        layout = IntLayout(virtual_to_physical, self._coupling_map.size())
+        return self.search_layout(layout, iter, last_swap)
 
-        class Gate:
-            def __init__(self, swap, qreg):
-                self.op = SwapGate()
-                self.qargs = [qreg[qarg] for qarg in swap['swap']]
-                self.cargs = []
-                self.condition = None
+    def _search_key(self, layout, iter, last_swap):
+        """
+        Args:
+            layout (IntLayout): the current layout.
+            iter (int): remaining search depth.
+            last_swap (list): last swap applied to the layout.
 
-        return Gate(swap, self._qreg)
+        Returns:
+            (tuple): hashable search state, made of the layout permutation,
+                the front layer and the remaining search depth.
+        """
+        permutation = layout.key()
+        position = self._front_layer.key()
+        # the last swap only restricts the swaps considered in front mode
+        if self._front and iter > 0 and last_swap is not None:
+            last_swap = tuple(sorted(last_swap))
+        else:
+            last_swap = None
+        return permutation, position, iter, last_swap
 
-    def update_to_execute(self, gates, layout):
+    def execute_swap_gate(self, swap):
         """
 
         Args:
-            gates (list): gates to be executed.
-            layout (Layout): current circuit layout.
+            swap (list): physical qubits of the swap to be executed.
 
         Returns:
-            (tuple):
-                to_execute (list): gates to be executed.
-                to_map (list): list of the front layer of gates that cannot be executed.
-                executed (list): list of executed gates.
+            (tuple): executed swap gate as (None, physical qargs).
         """
-        busy = set()
-        executed = []
-        to_execute = []
-        to_map = []
-        for gate in gates:
-            qargs = gate.qargs
-
-            if gate.name in ["barrier", "snapshot", "save", "load", "noise"]:
-                if not qargs:
-                    continue
-                if busy.intersection(qargs):
-                    busy.update(qargs)
-                    to_execute.append(gate)
-                else:
-                    executed.append(self.execute_gate(gate, layout))
-                continue
-
-            if not busy.intersection(qargs):
-                if len(qargs) == 1:
-                    executed.append(self.execute_gate(gate, layout))
-                elif self._coupling_map.distance(*[layout[q] for q in qargs]) == 1:
-                    logger.debug('Executed two-qubit gate with qargs: %s\n' % gate.qargs)
-                    executed.append(self.execute_gate(gate, layout))
-                else:
-                    logger.debug('Remote gate with qargs: %s\n' % gate.qargs)
-                    to_execute.append(gate)
-                    to_map.append(gate)
-                    busy.update(qargs)
-            else:
-                to_execute.append(gate)
-                busy.update(qargs)
-        return to_execute, to_map, executed
 
-    def new_possible_swaps(self, to_map, layout, to_execute, n=4, last_swap=None):
+        return None, tuple(swap)
+
+    def new_possible_swaps(self, layout, n=4, last_swap=None):
         """
 
         Args:
-            remote_cnot (DAGNode): remote cnot.
-            layout (Layout): current circuit layout.
-            to_execute (list): gates to be executed.
+            layout (IntLayout): current circuit layout.
             n (int): number of possible swaps to consider.
+            last_swap (list): last swap applied to the layout, not considered again.
 
         Returns:
             possible_swaps (list): list of possible swaps ranked by their score.
         """
-        temp_layout = layout.copy()
         qubits = []
         swap_qubits = []
         if last_swap:
             swap_qubits.append((last_swap[0], last_swap[1]))
-        for gate in to_map:
-            virt_qargs = gate.qargs
-            qubits.extend([self.get_phys_qubit(q, temp_layout) for q in virt_qargs])
-        possible_swaps = []
+        for gate in self._front_layer.front:
+            qubits.extend([layout[q] for q in self._front_layer.qubits(gate)])
+        swaps = []
 
         for q in qubits:
             for v in self._coupling_graph[q]:
                 if (q, v) in swap_qubits or (v, q) in swap_qubits:
                     continue
-                swap = dict()
-                swap['swap'], swap['score'] = self.score_swap([q, v], temp_layout, to_execute,
-                                                              next_gates=self._next_gates, to_map=to_map)
-                possible_swaps.append(swap)
-                swap_qubits.append((q,v))
+                swaps.append([q, v])
+                swap_qubits.append((q, v))
+        if not swaps:
+            return []
+        scores = self.score_swaps(swaps, layout, next_gates=self._next_gates)
+        possible_swaps = [{'swap': swap, 'score': score} for swap, score in zip(swaps, scores)]
         possible_swaps = sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
 
         return possible_swaps[:n]
 
-    def possible_swaps(self, remote_cnot, layout, to_execute, n=4):
+    def possible_swaps(self, remote_cnot, layout, n=4):
         """
 
         Args:
-            remote_cnot (DAGNode): remote cnot.
-            layout (Layout): current circuit layout.
-            to_execute (list): gates to be executed.
+            remote_cnot (int): index of a remote cnot of the front layer.
+            layout (IntLayout): current circuit layout.
             n (int): number of possible swaps to consider.
 
         Returns:
@@ -414,153 +442,94 @@ class NoiseAdaptiveSwap(TransformationPass):
         if n < 1:
             raise TranspilerError('Invalid option for possible number of swaps.')
 
-        temp_layout = layout.copy()
-        virt_qargs = remote_cnot.qargs
-        qubits = [self.get_phys_qubit(q, temp_layout) for q in virt_qargs]
-        possible_swaps = []
-        extra_swaps = []
-
-        swap = {'swap': None, 'score': None}
-        for q in self._coupling_graph[qubits[0]]:
-            swap['swap'], swap['score'] = self.score_swap([qubits[0], q], temp_layout, to_execute,
-                                                          next_gates=self._next_gates)
-            extra_swaps.append(swap)
-        for q in self._coupling_graph[qubits[1]]:
-            swap['swap'], swap['score'] = self.score_swap([qubits[1], q], temp_layout, to_execute,
-                                                          next_gates=self._next_gates)
-            extra_swaps.append(swap)
-
-        # most reliab qubits[0] to qubits[1]
-        right = self.swap_paths[qubits[1]][qubits[0]]
-        swap['swap'], swap['score'] = self.score_swap([qubits[0], right], temp_layout, to_execute,
-                                                      next_gates=self._next_gates)
-        possible_swaps.append(swap)
-        extra_swaps.remove(swap)
-        n -= 1
-        if n == 0:
-            return possible_swaps
-
-        # most reliab qubits[1] to qubits[0]
-        right = self.swap_paths[qubits[0]][qubits[1]]
-        swap['swap'], swap['score'] = self.score_swap([qubits[1], right], temp_layout, to_execute,
-                                                      next_gates=self._next_gates)
-        possible_swaps.append(swap)
-        extra_swaps.remove(swap)
-        n -= 1
-        if n == 0:
-            return sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
-
-        # shortest path if not already in possible_swaps
-        shortest_path = self._coupling_map.shortest_undirected_path(qubits[0], qubits[1])
-        swap['swap'], swap['score'] = self.score_swap([qubits[0], shortest_path[1]], temp_layout, to_execute,
-                                                      next_gates=self._next_gates)
-        if swap not in possible_swaps:
-            possible_swaps.append(swap)
-            extra_swaps.remove(swap)
-            n -= 1
-            if n == 0:
-                return sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
-
-        swap['swap'], swap['score'] = self.score_swap([qubits[1], shortest_path[-2]], temp_layout, to_execute,
-                                                      next_gates=self._next_gates)
-        if swap not in possible_swaps:
-            possible_swaps.append(swap)
-            extra_swaps.remove(swap)
-            n -= 1
-            if n == 0:
-                return sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
-
-        while n != 0 and extra_swaps:
-            possible_swaps.append(extra_swaps[0])
-            extra_swaps.remove(extra_swaps[0])
-            n -= 1
-
-        return sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
-
-    def score_swap(self, swap, layout, to_execute, next_gates=10, to_map=None):
-        return self.score_swap_alpha(swap, layout, to_execute, next_gates, to_map)
-
-    def score_swap_alpha(self, swap, layout, to_execute, next_gates=5, to_map=None):
-        temp_layout = layout.copy()
-        temp_layout.swap(*swap)
-        reliabs = list()
-        if to_map:
-            reliabs.extend([self.swap_reliabs[self.get_phys_qubit(gate.qargs[0], temp_layout)]
-                         [self.get_phys_qubit(gate.qargs[1], temp_layout)]
-                         for gate in to_map])
-        reliabs.extend([self.swap_reliabs[self.get_phys_qubit(gate.qargs[0], temp_layout)]
-                         [self.get_phys_qubit(gate.qargs[1], temp_layout)]
-                         for gate in to_execute[:next_gates]
-                         if gate.name not in ["barrier", "snapshot", "save", "load", "noise"] and \
-                         len(gate.qargs) == 2])
-        reliab = reduce(lambda x, y: x + y, reliabs)
-        reliab /= len(reliabs)
-
-        distance = 0
-        count = 0
-        if to_map:
-            for gate in to_map:
-                if not self._coupling_map.distance(self.get_phys_qubit(gate.qargs[0], temp_layout),
-                                               self.get_phys_qubit(gate.qargs[1], temp_layout)) == 1:
-                    distance += (self._coupling_map.distance(self.get_phys_qubit(gate.qargs[0], temp_layout),
-                                               self.get_phys_qubit(gate.qargs[1], temp_layout))-1)/(self._max_distance-1)
-                count += 1
-        for gate in to_execute:
-            if gate.name not in ["barrier", "snapshot", "save", "load", "noise"] and len(gate.qargs) == 2:
-
-                if not self._coupling_map.distance(self.get_phys_qubit(gate.qargs[0], temp_layout),
-                                               self.get_phys_qubit(gate.qargs[1], temp_layout)) == 1:
-                    distance += (self._coupling_map.distance(self.get_phys_qubit(gate.qargs[0], temp_layout),
-                                               self.get_phys_qubit(gate.qargs[1], temp_layout))-1)/(self._max_distance-1)
-                next_gates -= 1
-                count += 1
-                if next_gates == 0:
+        qubits = [layout[q] for q in self._front_layer.qubits(remote_cnot)]
+
+        # most reliab qubits[0] to qubits[1] and qubits[1] to qubits[0]
+        candidates = [[qubits[0], int(self._next_hop[qubits[0], qubits[1]])],
+                      [qubits[1], int(self._next_hop[qubits[1], qubits[0]])]]
+        # shortest path, ties between paths of the same length are broken by the hop table,
+        # and the step of qubits[1] is the first hop of its own shortest path to qubits[0]
+        candidates.append([qubits[0], int(self._hop_next[qubits[0], qubits[1]])])
+        candidates.append([qubits[1], int(self._hop_next[qubits[1], qubits[0]])])
+        # any other swap involving the qubits of the remote cnot
+        candidates.extend([qubits[0], q] for q in self._coupling_graph[qubits[0]])
+        candidates.extend([qubits[1], q] for q in self._coupling_graph[qubits[1]])
+
+        swaps = []
+        for swap in candidates:
+            if swap not in swaps and swap[::-1] not in swaps:
+                swaps.append(swap)
+                if len(swaps) == n:
                     break
-        distance /= count
 
-        score = self._alpha*reliab + (1-self._alpha)*(1-distance)
+        scores = self.score_swaps(swaps, layout, next_gates=self._next_gates)
+        possible_swaps = [{'swap': swap, 'score': score} for swap, score in zip(swaps, scores)]
 
-        return swap, score
+        return sorted(possible_swaps, key=lambda x: x['score'], reverse=True)
 
-    def execute_gate(self, gate, layout):
+    def score_swaps(self, swaps, layout, next_gates=10):
+        return self.score_swaps_alpha(swaps, layout, next_gates)
+
+    def score_swaps_alpha(self, swaps, layout, next_gates=5):
         """
+        Scores all the possible swaps of a search step at once, as a weighted sum
+        of the mean swap path reliability and the mean normalized distance
+        of the remote cnots and of the following two-qubit gates.
 
         Args:
-            gate (DAGNode): gate to be executed.
-            layout (Layout): current circuit layout.
+            swaps (list): possible swaps, as pairs of physical qubits.
+            layout (IntLayout): current circuit layout.
+            next_gates (int): number of following two-qubit gates used to score the swaps.
 
         Returns:
-            executed_gate (DAGNode): excuted gate.
+            scores (numpy.ndarray): score of every swap.
         """
-        executed_gate = deepcopy(gate)
-        new_qargs = [self.get_reg(q, layout) for q in executed_gate.qargs]
-        executed_gate.qargs = executed_gate.op.qargs = new_qargs
+        pairs, n_reliab = self._front_layer.pending_pairs(next_gates)
 
-        return executed_gate
+        swaps = np.asarray(swaps, dtype=int)
+        first = swaps[:, 0, np.newaxis, np.newaxis]
+        second = swaps[:, 1, np.newaxis, np.newaxis]
+        # physical qubits of the pending gates after each swap
+        phys = layout.to_physical(pairs)[np.newaxis]
+        phys = np.where(phys == first, second, np.where(phys == second, first, phys))
 
-    def get_reg(self, virt_qubit, layout):
-        """
+        reliab = self.swap_reliabs[phys[:, :n_reliab, 0], phys[:, :n_reliab, 1]].sum(axis=1)
+        reliab /= n_reliab
 
-        Args:
-            virt_qubit (qiskit.circuit.Qubit): virtual qubit.
-            layout (Layout): current circuit layout.
+        distances = self._distance_matrix[phys[:, :, 0], phys[:, :, 1]]
+        if self._max_distance > 1:
+            distances = np.where(distances == 1, 0, (distances - 1) / (self._max_distance - 1))
+        else:
+            distances = np.zeros(distances.shape)
+        distance = distances.sum(axis=1) / len(pairs)
 
-        Returns:
-            current_qubit (qiskit.circuit.Qubit): virt_qubit register in the circuit.
-        """
+        return self._alpha*reliab + (1-self._alpha)*(1-distance)
 
-        return self._qreg[layout[virt_qubit]]
 
-    @staticmethod
-    def get_phys_qubit(virt_qubit, layout):
-        """
+def _share_array(array):
+    """
+    Args:
+        array (numpy.ndarray): array to be shared with the worker processes.
 
-        Args:
-            virt_qubit (qiskit.circuit.Qubit): virtual qubit.
-            layout (Layout): current circuit layout.
+    Returns:
+        (tuple): shared memory copy of the array, its shape and its data type.
+    """
+    shared = RawArray(np.ctypeslib.as_ctypes_type(array.dtype), array.size)
+    np.frombuffer(shared, dtype=array.dtype)[:] = np.ravel(array)
+    return shared, array.shape, array.dtype.str
+
+
+def _init_worker(state, tables, front_layer, shared_executed):
+    global _worker_pass
+    swap_pass = NoiseAdaptiveSwap.__new__(NoiseAdaptiveSwap)
+    swap_pass.__dict__.update(state)
+    swap_pass._distance_matrix, swap_pass.swap_reliabs, swap_pass._next_hop, swap_pass._hop_next = [
+        np.frombuffer(shared, dtype=dtype).reshape(shape) for shared, shape, dtype in tables]
+    swap_pass._front_layer = front_layer
+    swap_pass._shared_executed = np.frombuffer(shared_executed, dtype=np.uint8)
+    swap_pass._pool = None
+    _worker_pass = swap_pass
 
-        Returns:
-            physical_qubit: virt_qubit position in the coupling map.
-        """
 
-        return layout[virt_qubit]
+def _search_subtree(task):
+    return _worker_pass.search_subtree(*task)
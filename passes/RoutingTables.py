@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from .Calibration import Calibration
+
+logger = logging.getLogger(__name__)
+
+# bump when the content of the cached tables changes
+_CACHE_VERSION = 4
+
+
+def floyd_warshall(weights):
+    """Vectorized Floyd-Warshall all-pairs shortest paths.
+
+    Args:
+        weights (numpy.ndarray): square matrix of edge weights, `inf` where there is no edge.
+
+    Returns:
+        (tuple):
+            distance (numpy.ndarray): shortest path length between every pair of nodes.
+            next_hop (numpy.ndarray): first node after `i` on the shortest path from `i` to `j`,
+                -1 if `j` cannot be reached.
+    """
+    distance = np.array(weights, dtype=np.float64)
+    num_nodes = len(distance)
+    nodes = np.arange(num_nodes)
+    next_hop = np.where(np.isfinite(distance), nodes[np.newaxis, :], -1)
+    np.fill_diagonal(distance, 0)
+    np.fill_diagonal(next_hop, nodes)
+    for k in range(num_nodes):
+        through_k = distance[:, k, np.newaxis] + distance[np.newaxis, k, :]
+        shorter = through_k < distance
+        distance = np.where(shorter, through_k, distance)
+        next_hop = np.where(shorter, next_hop[:, k, np.newaxis], next_hop)
+    return distance, next_hop
+
+
+def swap_cost(cx_reliab):
+    """
+    Args:
+        cx_reliab (float): reliability of a cnot.
+
+    Returns:
+        float: edge weight of a swap, made of three cnots,
+            for the Floyd-Warshall shortest weighted paths algorithm.
+    """
+    swap_reliab = pow(cx_reliab, 3)
+    return -math.log(swap_reliab) if swap_reliab != 0 else 10**(-10)
+
+
+class RoutingTables:
+    """
+    Dense all-pairs tables used by NoiseAdaptiveSwap to score swaps, built once per backend:
+
+        * distance: number of hops between every pair of physical qubits,
+        * hop_next: first qubit on a shortest path, in hops, between two physical qubits,
+        * swap_reliab: normalized reliability of the most reliable swap path that brings
+          two physical qubits next to each other, times the reliability of the final cnot,
+        * next_hop: first qubit on the most reliable swap path between two physical qubits,
+        * cx_reliability: reliability of every calibrated cnot the tables are derived from.
+    """
+
+    def __init__(self, distance, swap_reliab, next_hop, cx_reliability, hop_next):
+        """RoutingTables initializer.
+
+        Args:
+            distance (numpy.ndarray): hop distance matrix.
+            swap_reliab (numpy.ndarray): normalized swap reliability matrix.
+            next_hop (numpy.ndarray): next hop matrix of the most reliable swap paths.
+            cx_reliability (dict): reliability of every calibrated cnot, keyed by (control, target).
+            hop_next (numpy.ndarray): next hop matrix of the shortest paths in hops.
+        """
+        self.distance = distance
+        self.swap_reliab = swap_reliab
+        self.next_hop = next_hop
+        self.cx_reliability = cx_reliability
+        self.hop_next = hop_next
+        finite = distance[np.isfinite(distance)]
+        self.max_distance = finite.max() if finite.size else 0
+
+    @classmethod
+    def build(cls, coupling_map, cx_reliability, swap_costs):
+        """Builds the routing tables of a backend.
+
+        Args:
+            coupling_map (CouplingMap): the device coupling map.
+            cx_reliability (dict): reliability of every calibrated cnot, keyed by (control, target).
+            swap_costs (dict): -log of the reliability of a swap on every calibrated edge,
+                keyed by (qubit, qubit).
+
+        Returns:
+            RoutingTables: the routing tables, indexed by physical qubit.
+        """
+        num_qubits = coupling_map.size()
+        # calibration data may include qubits that are not in the coupling map
+        calibrated = {q for edge in swap_costs for q in edge}
+        size = max([num_qubits] + [q + 1 for q in calibrated])
+
+        hops = np.full((num_qubits, num_qubits), np.inf)
+        for i, j in coupling_map.get_edges():
+            hops[i, j] = hops[j, i] = 1
+        distance, hop_next = floyd_warshall(hops)
+
+        costs = np.full((size, size), np.inf)
+        for (i, j), cost in swap_costs.items():
+            costs[i, j] = costs[j, i] = cost
+        cx_reliab = np.full((size, size), np.nan)
+        for (i, j), reliab in cx_reliability.items():
+            cx_reliab[i, j] = reliab
+        # a cnot can be used in both directions, prefer the calibration of the given one
+        cx_reliab = np.where(np.isnan(cx_reliab), cx_reliab.T, cx_reliab)
+        edges = ~np.isnan(cx_reliab)
+
+        swap_distance, next_hop = floyd_warshall(costs)
+        path_reliab = np.exp(-swap_distance)
+        swap_reliab = np.where(edges, cx_reliab, 0.0)
+        # for remote qubits, swap one of them next to a neighbor of the other one
+        # along the most reliable path and then apply the cnot
+        for j in range(size):
+            neighbors = np.flatnonzero(edges[j])
+            if neighbors.size == 0:
+                continue
+            best = (path_reliab[:, neighbors] * cx_reliab[neighbors, j]).max(axis=1)
+            swap_reliab[:, j] = np.where(edges[:, j], swap_reliab[:, j], best)
+
+        mask = np.zeros(size, dtype=bool)
+        mask[list(calibrated)] = True
+        mask = mask[:, np.newaxis] & mask[np.newaxis, :]
+        min_reliab = swap_reliab[mask].min(initial=1.0)
+        max_reliab = swap_reliab[mask].max(initial=0.0)
+        swap_reliab = np.where(mask, (swap_reliab - min_reliab) / (max_reliab - min_reliab), 0.0)
+
+        return cls(distance, np.ascontiguousarray(swap_reliab[:num_qubits, :num_qubits]),
+                   np.ascontiguousarray(next_hop[:num_qubits, :num_qubits]), dict(cx_reliability), hop_next)
+
+    @classmethod
+    def load(cls, cache_dir, key):
+        """Loads the routing tables of a calibration from an on-disk cache.
+
+        Args:
+            cache_dir (str): cache directory.
+            key (str): calibration key, see calibration_key().
+
+        Returns:
+            RoutingTables: the memory-mapped routing tables, None if they are not in the cache.
+        """
+        arrays = load_arrays(cache_dir, key, ('distance', 'swap_reliab', 'next_hop', 'cx_qubits', 'cx_reliab',
+                                              'hop_next'))
+        if arrays is None:
+            return None
+        cx_reliability = dict(zip([tuple(edge) for edge in arrays['cx_qubits'].tolist()],
+                                  arrays['cx_reliab'].tolist()))
+        return cls(arrays['distance'], arrays['swap_reliab'], arrays['next_hop'], cx_reliability, arrays['hop_next'])
+
+    def save(self, cache_dir, key):
+        """Stores the routing tables of a calibration in an on-disk cache.
+
+        Args:
+            cache_dir (str): cache directory.
+            key (str): calibration key, see calibration_key().
+        """
+        save_arrays(cache_dir, key, {'distance': self.distance,
+                                     'swap_reliab': self.swap_reliab,
+                                     'next_hop': self.next_hop,
+                                     'cx_qubits': np.array(list(self.cx_reliability.keys()), dtype=int).reshape(-1, 2),
+                                     'cx_reliab': np.array(list(self.cx_reliability.values()), dtype=float),
+                                     'hop_next': self.hop_next})
+
+
+def calibration_key(coupling_map, backend_prop, readout):
+    """
+    Args:
+        coupling_map (CouplingMap): the device coupling map.
+        backend_prop (BackendProperties or Calibration): backend properties object,
+            None if not available.
+        readout (bool): whether readout errors are taken into account.
+
+    Returns:
+        str: hash of the calibration data the routing tables are derived from.
+    """
+    cx_errors = []
+    readout_errors = []
+    if isinstance(backend_prop, Calibration):
+        for qubits, error in zip(backend_prop.cx_qubits.tolist(), backend_prop.cx_error.tolist()):
+            cx_errors.append((tuple(qubits), None if math.isnan(error) else error))
+        if readout:
+            readout_errors = [error for error in backend_prop.readout_error.tolist() if not math.isnan(error)]
+    elif backend_prop is not None:
+        # scan the raw values, so that a cache hit does not parse the whole calibration,
+        # keeping the last value of each entry as Calibration does
+        for ginfo in backend_prop.gates:
+            if ginfo.gate == 'cx':
+                error = None
+                for item in ginfo.parameters:
+                    if item.name == 'gate_error':
+                        error = float(item.value)
+                cx_errors.append((tuple(ginfo.qubits), error))
+        if readout:
+            for qubit_info in backend_prop.qubits:
+                error = None
+                for info in qubit_info:
+                    if info.name == 'readout_error':
+                        error = float(info.value)
+                if error is not None:
+                    readout_errors.append(error)
+    data = (_CACHE_VERSION, coupling_map.size(), sorted(coupling_map.get_edges()),
+            cx_errors, readout_errors, bool(readout))
+    return hashlib.sha1(repr(data).encode()).hexdigest()
+
+
+def load_arrays(cache_dir, key, names):
+    """Loads arrays from an on-disk cache as read-only memory maps,
+    so that processes loading the same arrays share their pages.
+
+    Args:
+        cache_dir (str): cache directory.
+        key (str): calibration key.
+        names (iterable): names of the arrays.
+
+    Returns:
+        dict: memory-mapped arrays keyed by name, None if any of them is not in the cache.
+    """
+    arrays = {}
+    for name in names:
+        path = os.path.join(cache_dir, '%s-%s.npy' % (key, name))
+        try:
+            arrays[name] = np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            logger.debug('Cache miss: %s' % path)
+            return None
+    return arrays
+
+
+def save_arrays(cache_dir, key, arrays):
+    """Stores arrays in an on-disk cache.
+    Every array is written to a temporary file that is then renamed,
+    so that concurrent readers never see a partially written file.
+
+    Args:
+        cache_dir (str): cache directory.
+        key (str): calibration key.
+        arrays (dict): arrays keyed by name.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    for name, array in arrays.items():
+        path = os.path.join(cache_dir, '%s-%s.npy' % (key, name))
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(array))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
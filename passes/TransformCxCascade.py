@@ -1,4 +1,7 @@
 import logging
+from array import array
+
+import numpy as np
 
 from qiskit.dagcircuit import DAGCircuit
 from qiskit.extensions import CXGate, U2Gate
@@ -8,6 +11,11 @@ from qiskit.qasm import pi
 
 logger = logging.getLogger(__name__)
 
+# kinds of gates in the gate table
+_CX = 0
+_DIRECTIVE = 1
+_GATE = 2
+
 
 class TransformCxCascade(TransformationPass):
     """
@@ -37,21 +45,47 @@ class TransformCxCascade(TransformationPass):
 
     """
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """TransformCxCascade initializer.
+        Keyword Args:
+            max_iterations (int): maximum number of rounds of one-qubit gates optimization
+                and CNOT cancellation after the transformation,
+                default is None (until no gate is removed).
+            streaming (bool): if True the layers are computed while the dag is transformed,
+                and only the layers within reach of a cascade search are kept, default is False.
+                This bounds the layer lists and the gate indexes, not the peak memory:
+                the input and the output dags are still whole in memory.
         Raises:
-            TranspilerError: if run after the layout has been set.
+            TranspilerError: if run after the layout has been set or invalid options.
         """
         super().__init__()
         if self.property_set['layout']:
             raise TranspilerError('TransformCxCascade pass must be run before any layout has been set.')
+        if 'max_iterations' in kwargs:
+            self._max_iterations = kwargs['max_iterations']
+        else:
+            self._max_iterations = None
+        if self._max_iterations is not None and self._max_iterations < 1:
+            raise TranspilerError('max_iterations must be at least 1')
+        if 'streaming' in kwargs:
+            self._streaming = kwargs['streaming']
+        else:
+            self._streaming = False
         self.requires.append(Unroller(['u1', 'u2', 'u3', 'cx', 'id']))
         self._num_qubits = None
         self._wires_to_id = {}
         self._id_to_wires = {}
-        self._layers = None
-        self._extra_layers = None
-        self._skip = []
+        self._layers = {}
+        self._num_layers = 0
+        self._dag_layers = None
+        self._layer_index = {}
+        self._extra_layers = {}
+        self._skip = set()
+        self._next_gate = {}
+        self._last_gate = {}
+        self._gate_kind = array('b')
+        self._gate_control = array('i')
+        self._gate_target = array('i')
 
     def run(self, dag):
         """
@@ -60,6 +94,7 @@ class TransformCxCascade(TransformationPass):
         After the transformation, proceeds to check for possible one-qubit gates optimizations and
         CNOT cancellations, as subsequent CNOT nearest-neighbor sequences could create
         the opportunity for useful circuit simplifications.
+        The number of gates they remove is stored in the property set as 'cx_cascade_removed_gates'.
 
         Args:
             dag (DAGCircuit): the dag circuit to be searched for CNOT cascades.
@@ -84,73 +119,272 @@ class TransformCxCascade(TransformationPass):
                 self._id_to_wires[i] = q
                 i += 1
 
-        depth = new_dag.depth()
-        while True:
-            new_dag = Optimize1qGates().run(new_dag)
-            new_dag = CXCancellation().run(new_dag)
-            new_depth = new_dag.depth()
-            if new_depth < depth:
-                depth = new_depth
-            else:
-                break
+        self.index_gates(dag)
 
-        # get dag layers
-        self._layers = [layer['graph'] for layer in dag.layers()]
+        # gates already used, either applied or part of a transformation
+        self._skip = set()
+        # get dag layers, either all of them or as they are needed
+        self._layers = {}
+        self._num_layers = 0
         # this is the list of new layers for the nearest-neighbor CNOT sequences
-        self._extra_layers = {l: [] for l in range(len(self._layers))}
+        self._extra_layers = {}
+        self._layer_index = {}
+        self._next_gate = {}
+        self._last_gate = {}
+        if self._streaming:
+            self._dag_layers = self.stream_layers(dag)
+        else:
+            self._dag_layers = self.dag_layers(dag)
+            self.load_layers()
+        # a cascade search never goes beyond this number of layers
+        reach = max(2 * (self._num_qubits - 1), 1)
         # loop through all layers
-        for i, layer in enumerate(self._layers):
-            if i != 0:
-                # add nearest-neighbor CNOT sequences in the right layer
-                for gate in self._extra_layers[i - 1]:
-                    new_dag.apply_operation_back(*gate)
+        i = 0
+        while True:
+            if self._streaming:
+                self.load_layers(i + reach)
+            if i == self._num_layers:
+                break
 
             # check all gates in the layer
-            for gate in layer.op_nodes():
+            for gate in self._layers[i]:
                 temp = None
                 # do not add gates that have been used in the transformation process
                 if gate in self._skip:
                     continue
                 # every cnot could be the starting point for a CNOT cascade
-                elif gate.name == 'cx':
-                    logger.debug('Check Cascade %s with qargs: %s\n' % (gate.name, gate.qargs))
-                    # check for a CNOT cascade
-                    temp = self.check_cascade(gate, i)
+                elif self._gate_kind[gate._node_id] == _CX:
+                    logger.debug('Check Cascade %s with qargs: %s\n', gate.name, gate.qargs)
+                    # check for a CNOT cascade, if the next gate on the target can be part of it
+                    if self.continues_cascade(gate, i, 1):
+                        temp = self.check_cascade(gate, i)
                     if temp is not None:
-                        logger.info('Cascade Starts at %s with qargs: %s\n' % (gate.name, gate.qargs))
-                        self._skip.extend(temp)
+                        logger.info('Cascade Starts at %s with qargs: %s\n', gate.name, gate.qargs)
+                        self._skip.update(temp)
                     else:
                         logger.debug(
-                            'Check Inverse Cascade at %s with qargs: %s\n' % (gate.name, gate.qargs))
-                        # check for an inverted CNOT cascade
-                        temp = self.check_inverse_cascade(gate, i)
+                            'Check Inverse Cascade at %s with qargs: %s\n', gate.name, gate.qargs)
+                        # check for an inverted CNOT cascade, if the next gate on the control can be part of it
+                        if self.continues_cascade(gate, i, 0):
+                            temp = self.check_inverse_cascade(gate, i)
                         if temp is not None:
                             logger.info(
-                                'Inverse Cascade Starts at %s with qargs: %s\n' % (gate.name, gate.qargs))
-                            self._skip.extend(temp)
+                                'Inverse Cascade Starts at %s with qargs: %s\n', gate.name, gate.qargs)
+                            self._skip.update(temp)
                         else:
                             # apply the CNOT if no cascade was found
-                            self._skip.append(gate)
+                            self._skip.add(gate)
                             logger.debug(
-                                'Found Nothing at %s with qargs: %s\n' % (gate.name, gate.qargs))
+                                'Found Nothing at %s with qargs: %s\n', gate.name, gate.qargs)
                             new_dag.apply_operation_back(gate.op, gate.qargs, gate.cargs, gate.condition)
                 else:
-                    self._skip.append(gate)
+                    self._skip.add(gate)
                     new_dag.apply_operation_back(gate.op, gate.qargs, gate.cargs, gate.condition)
-        logger.debug('Cascades found: %s' % str(self._extra_layers))
+
+            # add nearest-neighbor CNOT sequences in the right layer
+            for gate in self._extra_layers.pop(i):
+                new_dag.apply_operation_back(*gate)
+            if self._streaming:
+                self.drop_layer(i)
+            i += 1
 
         # optimize dag after transformation
-        depth = new_dag.depth()
-        while True:
-            new_dag = Optimize1qGates().run(new_dag)
-            new_dag = CXCancellation().run(new_dag)
-            new_depth = new_dag.depth()
-            if new_depth < depth:
-                depth = new_depth
-            else:
-                break
+        size = new_dag.size()
+        new_dag = self.optimize(new_dag)
+        self.property_set['cx_cascade_removed_gates'] = size - new_dag.size()
         return new_dag
 
+    def optimize(self, dag):
+        """Alternates one-qubit gates optimization and CNOT cancellation until CNOT cancellation
+        removes no gate, for at most max_iterations rounds.
+        One-qubit gates optimization is idempotent, so once CNOT cancellation removes nothing
+        a new round would not change the dag.
+
+        Args:
+            dag (DAGCircuit): the dag circuit to be optimized.
+
+        Returns:
+            dag (DAGCircuit): the optimized dag.
+        """
+        start = dag.size()
+        iteration = 0
+        while self._max_iterations is None or iteration < self._max_iterations:
+            dag = Optimize1qGates().run(dag)
+            size = dag.size()
+            dag = CXCancellation().run(dag)
+            iteration += 1
+            if dag.size() == size:
+                break
+        logger.info('Optimization removed %d gates in %d rounds', start - dag.size(), iteration)
+        return dag
+
+
+    def index_gates(self, dag):
+        """Builds the gate table of the dag, indexed by node id: the kind of every gate,
+        the control and target qubit indices of CNOTs and the qubit index of other gates, as control.
+
+        Args:
+            dag (DAGCircuit): the dag circuit to be searched for CNOT cascades.
+        """
+        nodes = []
+        kinds = []
+        controls = []
+        targets = []
+        for gate in dag.op_nodes():
+            nodes.append(gate._node_id)
+            if gate.name in ["barrier", "snapshot", "save", "load", "noise"]:
+                kinds.append(_DIRECTIVE)
+                controls.append(-1)
+                targets.append(-1)
+            elif gate.name == 'cx':
+                kinds.append(_CX)
+                controls.append(self._wires_to_id[gate.qargs[0]])
+                targets.append(self._wires_to_id[gate.qargs[1]])
+            else:
+                kinds.append(_GATE)
+                controls.append(self._wires_to_id[gate.qargs[0]] if gate.qargs else -1)
+                targets.append(-1)
+        size = max(nodes) + 1 if nodes else 0
+        self._gate_kind = array('b', [_GATE]) * size
+        self._gate_control = array('i', [-1]) * size
+        self._gate_target = array('i', [-1]) * size
+        gate_table = self.gate_table()
+        gate_table['kind'][nodes] = kinds
+        gate_table['control'][nodes] = controls
+        gate_table['target'][nodes] = targets
+
+    def gate_table(self):
+        """
+        Returns:
+            dict: numpy views of the kind, control and target columns of the gate table.
+        """
+        return {'kind': np.frombuffer(self._gate_kind, dtype=np.int8),
+                'control': np.frombuffer(self._gate_control, dtype=np.int32),
+                'target': np.frombuffer(self._gate_target, dtype=np.int32)}
+
+    def qubit_ids(self, gate):
+        """
+        Args:
+            gate (DAGNode): a gate of the dag.
+
+        Returns:
+            tuple: indices of the qubits of the gate, -1 when a CNOT column is not used.
+        """
+        node = gate._node_id
+        if self._gate_kind[node] == _DIRECTIVE:
+            return tuple(self._wires_to_id[qarg] for qarg in gate.qargs)
+        return self._gate_control[node], self._gate_target[node]
+
+    @staticmethod
+    def dag_layers(dag):
+        """Splits the op nodes of the dag into the same layers as dag.layers(),
+        without building a new dag for every layer.
+
+        Args:
+            dag (DAGCircuit): the dag circuit to be searched for CNOT cascades.
+
+        Returns:
+            generator: the op nodes of every layer, in the order they were added to the dag.
+        """
+        graph_layers = dag.multigraph_layers()
+        # the first layer is made of input nodes
+        next(graph_layers, None)
+        for graph_layer in graph_layers:
+            op_nodes = sorted([node for node in graph_layer if node.type == 'op'], key=lambda node: node._node_id)
+            if not op_nodes:
+                return
+            yield op_nodes
+
+    @staticmethod
+    def stream_layers(dag):
+        """Splits the op nodes of the dag into the same layers as dag_layers(),
+        one layer at a time, only the number of executed predecessors of the nodes
+        that follow the current layer is kept.
+
+        Args:
+            dag (DAGCircuit): the dag circuit to be searched for CNOT cascades.
+
+        Returns:
+            generator: the op nodes of every layer, in the order they were added to the dag.
+        """
+        waiting = {}
+        layer = list(dag.input_map.values())
+        while True:
+            next_layer = []
+            for node in layer:
+                for succ in set(dag.successors(node)):
+                    if succ not in waiting:
+                        waiting[succ] = len(set(dag.predecessors(succ)))
+                    waiting[succ] -= 1
+                    if waiting[succ] == 0:
+                        del waiting[succ]
+                        next_layer.append(succ)
+            op_nodes = sorted([node for node in next_layer if node.type == 'op'], key=lambda node: node._node_id)
+            if not op_nodes:
+                return
+            yield op_nodes
+            layer = next_layer
+
+    def load_layers(self, num_layers=None):
+        """Reads the following layers of the dag, and links every gate to the following gate
+        on each of its qubits.
+
+        Args:
+            num_layers (int): number of layers to be read since the first one,
+                default is None (all the layers).
+        """
+        while num_layers is None or self._num_layers < num_layers:
+            op_nodes = next(self._dag_layers, None)
+            if op_nodes is None:
+                return
+            for gate in op_nodes:
+                self._layer_index[gate] = self._num_layers
+                self._next_gate[gate] = [None] * len(gate.qargs)
+                for k, qarg in enumerate(gate.qargs):
+                    if qarg in self._last_gate:
+                        prev, j = self._last_gate[qarg]
+                        prev[j] = gate
+                    self._last_gate[qarg] = (self._next_gate[gate], k)
+            self._layers[self._num_layers] = op_nodes
+            self._extra_layers[self._num_layers] = []
+            self._num_layers += 1
+
+    def drop_layer(self, layer_id):
+        """Forgets a layer that has been transformed, cascade searches only look at the following layers.
+
+        Args:
+            layer_id (int): layer index.
+        """
+        for gate in self._layers.pop(layer_id):
+            del self._layer_index[gate]
+            del self._next_gate[gate]
+            self._skip.discard(gate)
+
+    def continues_cascade(self, gate, layer_id, k):
+        """Checks whether the gate following a CNOT on its target (or control) qubit is a CNOT
+        with the same target (or control), within the layers searched for a cascade.
+        Any other gate on that qubit, except special multi-qubits gates, interrupts the search
+        before a second CNOT is found, so check_cascade (or check_inverse_cascade) would not find anything.
+
+        Args:
+            gate (DAGNode): first CNOT of a possible CNOT cascade.
+            layer_id (int): layer index of the CNOT.
+            k (int): 1 to follow the target qubit for a CNOT cascade,
+                0 to follow the control qubit for an inverted CNOT cascade.
+
+        Returns:
+            bool: False if the CNOT cannot start a cascade.
+        """
+        qarg = gate.qargs[k]
+        next_gate = self._next_gate[gate][k]
+        # special multi-qubits gates may be ignored by the search, look past them
+        while next_gate is not None and self._gate_kind[next_gate._node_id] == _DIRECTIVE:
+            next_gate = self._next_gate[next_gate][next_gate.qargs.index(qarg)]
+        if next_gate is None or self._layer_index[next_gate] - layer_id >= 2 * (self._num_qubits - 1):
+            return False
+        qubit_ids = self._gate_target if k == 1 else self._gate_control
+        return (self._gate_kind[next_gate._node_id] == _CX
+                and qubit_ids[next_gate._node_id] == qubit_ids[gate._node_id] and next_gate not in self._skip)
 
     def check_cascade(self, gate, layer_id):
         """Searches for a CNOT cascade, a sequence of CNOT gates where the target qubit
@@ -172,13 +406,15 @@ class TransformCxCascade(TransformationPass):
             layer_id (int): layer index of the CNOT.
 
         Returns:
-            skip (list): list of gates to be skipped as part of the CNOT cascade,
+            skip (set): gates to be skipped as part of the CNOT cascade,
             may include one-qubit gates that appears before or after the cascade.
         """
-        target = self._wires_to_id[gate.qargs[1]]
-        control = self._wires_to_id[gate.qargs[0]]
+        gate_kind, gate_control, gate_target = self._gate_kind, self._gate_control, self._gate_target
+        debug = logger.isEnabledFor(logging.DEBUG)
+        target = gate_target[gate._node_id]
+        control = gate_control[gate._node_id]
         controls = [control]
-        skip = [gate]
+        skip = {gate}
         # qubits already added to the CNOT sequence
         used = set()
         used.add(target)
@@ -198,24 +434,25 @@ class TransformCxCascade(TransformationPass):
 
         double_break = False
         # loop through layers until a max limit is reached
-        while count < min([2 * (self._num_qubits - 1), len(self._layers) - layer_id]):
-            for gate in self._layers[layer_id + count].op_nodes():
-                logger.debug('Last layer: %d' % last_layer)
-                logger.debug('Layer: %d' % (layer_id + count))
-                logger.debug('Off limits: %s' % off_limits)
-                logger.debug('Gate Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s' % (
-                    gate.name, gate.type, gate.qargs, gate.cargs, gate.condition))
+        while count < min([2 * (self._num_qubits - 1), self._num_layers - layer_id]):
+            for gate in self._layers[layer_id + count]:
+                node = gate._node_id
+                if debug:
+                    logger.debug('Last layer: %d', last_layer)
+                    logger.debug('Layer: %d', layer_id + count)
+                    logger.debug('Off limits: %s', off_limits)
+                    logger.debug('Gate Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s',
+                                 gate.name, gate.type, gate.qargs, gate.cargs, gate.condition)
                 if gate in self._skip:
-                    for qarg in gate.qargs:
-                        if self._wires_to_id[qarg] == target:
-                            double_break = True
-                            break
+                    if target in self.qubit_ids(gate):
+                        double_break = True
                 elif gate not in skip:
-                    if gate.name == 'cx' and gate not in self._skip:
-                        g_control = self._wires_to_id[gate.qargs[0]]
-                        g_target = self._wires_to_id[gate.qargs[1]]
-                        logger.debug('Check CNOT Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s' % (
-                            gate.name, gate.type, [g_control, g_target], gate.cargs, gate.condition))
+                    if gate_kind[node] == _CX:
+                        g_control = gate_control[node]
+                        g_target = gate_target[node]
+                        if debug:
+                            logger.debug('Check CNOT Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s',
+                                         gate.name, gate.type, [g_control, g_target], gate.cargs, gate.condition)
                         if g_control == target:
                             double_break = True
                             break
@@ -228,18 +465,20 @@ class TransformCxCascade(TransformationPass):
                                 used.add(g_target)
                             logger.debug('CNOT Off limits')
                             continue
-                        logger.debug('Used: %s' % str(used))
-                        logger.debug('Controls: %s' % str(controls))
-                        logger.debug('Control-G_control: %d-%d' % (control, g_control))
-                        logger.debug('Target-G_target: %d-%d' % (target, g_target))
+                        if debug:
+                            logger.debug('Used: %s', used)
+                            logger.debug('Controls: %s', controls)
+                            logger.debug('Control-G_control: %d-%d', control, g_control)
+                            logger.debug('Target-G_target: %d-%d', target, g_target)
                         # chek that the CNOT is part of the cascade
                         a = (g_target == target and g_control not in controls and g_control not in used)
                         b = (descending is True and g_control > target) or (descending is False and g_control < target)
-                        logger.debug('A: %s B: %s Descending: %s\n' % (a, b, descending))
+                        if debug:
+                            logger.debug('A: %s B: %s Descending: %s\n', a, b, descending)
                         if a and b:
                             controls.append(g_control)
                             used.add(g_control)
-                            skip.append(gate)
+                            skip.add(gate)
                         # check if the CNOT interrupts the cascade
                         elif g_target != target and g_control != target:
                             # remember to put the CNOT after the transformation
@@ -262,18 +501,13 @@ class TransformCxCascade(TransformationPass):
                             break
                     else:
                         # ignore gates acting on off limits qubits
-                        double_continue = False
-                        for qarg in gate.qargs:
-                            if self._wires_to_id[qarg] in off_limits:
-                                double_continue = True
-                                continue
-                        if double_continue is True:
+                        qargs = self.qubit_ids(gate)
+                        if any(qarg in off_limits for qarg in qargs):
                             continue
 
                         # for special multi-qubits gates, update used and off limits qubits properly,
                         # break the loop if necessary
-                        if gate.name in ["barrier", "snapshot", "save", "load", "noise"]:
-                            qargs = [self._wires_to_id[qarg] for qarg in gate.qargs]
+                        if gate_kind[node] == _DIRECTIVE:
                             if target in qargs:
                                 if last_layer > layer_id + count - 1:
                                     last_layer = layer_id + count - 1
@@ -304,14 +538,15 @@ class TransformCxCascade(TransformationPass):
                                     off_limits.add(qarg)
                         else:
                             # check if one-qubits gates either interrupt the cascade, can be applied after or before
-                            qarg = self._wires_to_id[gate.qargs[0]]
-                            logger.debug(gate.op.__class__)
-                            logger.debug('Gate Name: %s\tType: %s\tQarg: %s\tCarg: %s\tCond: %s' % (
-                                gate.name, gate.type, qarg, gate.cargs, gate.condition))
+                            qarg = gate_control[node]
+                            if debug:
+                                logger.debug(gate.op.__class__)
+                                logger.debug('Gate Name: %s\tType: %s\tQarg: %s\tCarg: %s\tCond: %s',
+                                             gate.name, gate.type, qarg, gate.cargs, gate.condition)
                             if qarg == target:
                                 logger.debug('After')
                                 after.append(gate)
-                                skip.append(gate)
+                                skip.add(gate)
                                 double_break = True
                                 break
                             if qarg not in used:
@@ -319,17 +554,17 @@ class TransformCxCascade(TransformationPass):
                                 if qarg not in before:
                                     before[qarg] = []
                                 before[qarg].append(gate)
-                                skip.append(gate)
+                                skip.add(gate)
                             else:
                                 logger.debug('After')
                                 after.append(gate)
-                                skip.append(gate)
+                                skip.add(gate)
             count += 1
             if double_break is True:
                 break
         # if a cascade was found
         if len(controls) > 1:
-            logger.debug('Found Cascade from layer %d to %d\n' % (layer_id, last_layer))
+            logger.debug('Found Cascade from layer %d to %d\n', layer_id, last_layer)
             if descending is True:
                 controls = sorted(controls)
             else:
@@ -384,13 +619,15 @@ class TransformCxCascade(TransformationPass):
                 layer_id (int): layer index of the CNOT.
 
             Returns:
-                skip (list): list of gates to be skipped as part of the inverted CNOT cascade,
+                skip (set): gates to be skipped as part of the inverted CNOT cascade,
                 may include one-qubit gates that appears before or after the cascade.
             """
-            target = self._wires_to_id[gate.qargs[1]]
-            control = self._wires_to_id[gate.qargs[0]]
+            gate_kind, gate_control, gate_target = self._gate_kind, self._gate_control, self._gate_target
+            debug = logger.isEnabledFor(logging.DEBUG)
+            target = gate_target[gate._node_id]
+            control = gate_control[gate._node_id]
             targets = [target]
-            skip = [gate]
+            skip = {gate}
             # qubits already added to the CNOT sequence
             used = set()
             used.add(target)
@@ -410,24 +647,25 @@ class TransformCxCascade(TransformationPass):
 
             double_break = False
             # loop through layers until a max limit is reached
-            while count < min([2 * (self._num_qubits - 1), len(self._layers) - layer_id]):
-                for gate in self._layers[layer_id + count].op_nodes():
-                    logger.debug('Last layer: %d' % last_layer)
-                    logger.debug('Layer: %d' % (layer_id + count))
-                    logger.debug('Off limits: %s' % off_limits)
-                    logger.debug('Gate Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s' % (
-                        gate.name, gate.type, gate.qargs, gate.cargs, gate.condition))
+            while count < min([2 * (self._num_qubits - 1), self._num_layers - layer_id]):
+                for gate in self._layers[layer_id + count]:
+                    node = gate._node_id
+                    if debug:
+                        logger.debug('Last layer: %d', last_layer)
+                        logger.debug('Layer: %d', layer_id + count)
+                        logger.debug('Off limits: %s', off_limits)
+                        logger.debug('Gate Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s',
+                                     gate.name, gate.type, gate.qargs, gate.cargs, gate.condition)
                     if gate in self._skip:
-                        for qarg in gate.qargs:
-                            if self._wires_to_id[qarg] == control:
-                                double_break = True
-                                break
+                        if control in self.qubit_ids(gate):
+                            double_break = True
                     elif gate not in skip:
-                        if gate.name == 'cx' and gate not in self._skip:
-                            g_control = self._wires_to_id[gate.qargs[0]]
-                            g_target = self._wires_to_id[gate.qargs[1]]
-                            logger.debug('Check CNOT Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s' % (
-                                gate.name, gate.type, [g_control, g_target], gate.cargs, gate.condition))
+                        if gate_kind[node] == _CX:
+                            g_control = gate_control[node]
+                            g_target = gate_target[node]
+                            if debug:
+                                logger.debug('Check CNOT Name: %s\tType: %s\tQargs: %s\tCargs: %s\tCond: %s',
+                                             gate.name, gate.type, [g_control, g_target], gate.cargs, gate.condition)
                             if g_target == control:
                                 double_break = True
                                 break
@@ -442,18 +680,20 @@ class TransformCxCascade(TransformationPass):
                                     used.add(g_target)
                                 logger.debug('CNOT off limits')
                                 continue
-                            logger.debug('Used: %s' % str(used))
-                            logger.debug('Targets: %s' % str(targets))
-                            logger.debug('Control-G_control: %d-%d' % (control, g_control))
-                            logger.debug('Target-G_target: %d-%d' % (target, g_target))
+                            if debug:
+                                logger.debug('Used: %s', used)
+                                logger.debug('Targets: %s', targets)
+                                logger.debug('Control-G_control: %d-%d', control, g_control)
+                                logger.debug('Target-G_target: %d-%d', target, g_target)
                             # chek that the CNOT is part of the cascade
                             a = (g_control == control and g_target not in targets and g_target not in used)
                             b = (descending is True and g_target > control) or (descending is False and g_target < control)
-                            logger.debug('A: %s B: %s Descending: %s\n' % (a, b, descending))
+                            if debug:
+                                logger.debug('A: %s B: %s Descending: %s\n', a, b, descending)
                             if a and b:
                                 targets.append(g_target)
                                 used.add(g_target)
-                                skip.append(gate)
+                                skip.add(gate)
                             # check if the CNOT interrupts the cascade
                             elif g_control != control and g_target != control:
                                 # remember to put the CNOT after the transformation
@@ -476,18 +716,13 @@ class TransformCxCascade(TransformationPass):
                                 break
                         else:
                             # ignore gates acting on off limits qubits
-                            double_continue = False
-                            for qarg in gate.qargs:
-                                if self._wires_to_id[qarg] in off_limits:
-                                    double_continue = True
-                                    continue
-                            if double_continue is True:
+                            qargs = self.qubit_ids(gate)
+                            if any(qarg in off_limits for qarg in qargs):
                                 continue
 
                             # for special multi-qubits gates, update used and off limits qubits properly,
                             # break the loop if necessary
-                            if gate.name in ["barrier", "snapshot", "save", "load", "noise"]:
-                                qargs = [self._wires_to_id[qarg] for qarg in gate.qargs]
+                            if gate_kind[node] == _DIRECTIVE:
                                 if control in qargs:
                                     if last_layer > layer_id + count - 1:
                                         last_layer = layer_id + count - 1
@@ -518,14 +753,15 @@ class TransformCxCascade(TransformationPass):
                                         off_limits.add(qarg)
                             else:
                                 # check if one-qubits gates either interrupt the cascade, can be applied after or before
-                                qarg = self._wires_to_id[gate.qargs[0]]
-                                logger.debug(gate.op.__class__)
-                                logger.debug('Gate Name: %s\tType: %s\tQarg: %s\tCarg: %s\tCond: %s' % (
-                                    gate.name, gate.type, qarg, gate.cargs, gate.condition))
+                                qarg = gate_control[node]
+                                if debug:
+                                    logger.debug(gate.op.__class__)
+                                    logger.debug('Gate Name: %s\tType: %s\tQarg: %s\tCarg: %s\tCond: %s',
+                                                 gate.name, gate.type, qarg, gate.cargs, gate.condition)
                                 if qarg == control:
                                     logger.debug('After')
                                     after.append(gate)
-                                    skip.append(gate)
+                                    skip.add(gate)
                                     double_break = True
                                     break
                                 if qarg not in used:
@@ -533,18 +769,18 @@ class TransformCxCascade(TransformationPass):
                                     if qarg not in before:
                                         before[qarg] = []
                                     before[qarg].append(gate)
-                                    skip.append(gate)
+                                    skip.add(gate)
                                 else:
                                     logger.debug('After')
                                     after.append(gate)
-                                    skip.append(gate)
+                                    skip.add(gate)
 
                 count += 1
                 if double_break is True:
                     break
             # if an inverse cascade was found
             if len(targets) > 1:
-                logger.debug('Found Inverse Cascade from layer %d to %d\n' % (layer_id, last_layer))
+                logger.debug('Found Inverse Cascade from layer %d to %d\n', layer_id, last_layer)
                 if descending is True:
                     targets = sorted(targets)
                 else:
@@ -1,3 +1,4 @@
+from .Calibration import Calibration
 from .ChainLayout import ChainLayout
 from .NoiseAdaptiveSwap import NoiseAdaptiveSwap
 from .TransformCxCascade import *
@@ -0,0 +1,49 @@
+import unittest
+
+from metrics import hog, HeavyOutputGeneration
+
+
+def reference_hog(real_counts, ideal_probs):
+    """Heavy output generation by dict lookups, as computed before packing the bitstrings."""
+    probs = sorted(ideal_probs.values())
+    middle = len(probs) // 2
+    median = probs[middle] if len(probs) % 2 else (probs[middle - 1] + probs[middle]) / 2
+    heavy = sum(count for key, count in real_counts.items() if ideal_probs.get(key, 0) > median)
+    return heavy / sum(real_counts.values())
+
+
+class TestHeavyOutputGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.ideal_probs = {'000': 0.3, '001': 0.25, '010': 0.2, '011': 0.1,
+                            '100': 0.08, '101': 0.04, '110': 0.02, '111': 0.01}
+        self.real_counts = {'000': 250, '001': 200, '010': 180, '011': 120,
+                            '100': 100, '101': 80, '110': 50, '111': 44}
+
+    def test_hog(self):
+        self.assertAlmostEqual(hog(self.real_counts, self.ideal_probs),
+                               reference_hog(self.real_counts, self.ideal_probs))
+
+    def test_multiple_registers(self):
+        """Counts of circuits with several classical registers have spaces between the registers."""
+        ideal_probs = {'%s %s' % (key[:2], key[2:]): prob for key, prob in self.ideal_probs.items()}
+        real_counts = {'%s %s' % (key[:2], key[2:]): count for key, count in self.real_counts.items()}
+        expected = reference_hog(self.real_counts, self.ideal_probs)
+        self.assertAlmostEqual(reference_hog(real_counts, ideal_probs), expected)
+        self.assertAlmostEqual(hog(real_counts, ideal_probs), expected)
+        evaluator = HeavyOutputGeneration(ideal_probs)
+        self.assertAlmostEqual(evaluator.scores([real_counts, self.real_counts])[0], expected)
+        self.assertAlmostEqual(evaluator.scores([real_counts, self.real_counts])[1], expected)
+        shots = [key for key, count in real_counts.items() for _ in range(count)]
+        self.assertAlmostEqual(evaluator.score_shots(shots), expected)
+
+    def test_scores(self):
+        other_counts = {'000': 10, '111': 30, '1010': 5}
+        evaluator = HeavyOutputGeneration(self.ideal_probs)
+        scores = evaluator.scores([self.real_counts, other_counts])
+        self.assertAlmostEqual(scores[0], reference_hog(self.real_counts, self.ideal_probs))
+        self.assertAlmostEqual(scores[1], reference_hog(other_counts, self.ideal_probs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from qiskit import transpile
+from qiskit.converters import circuit_to_dag
+from qiskit.transpiler import PassManager
+from qiskit.transpiler.passes import TrivialLayout, FullAncillaAllocation, EnlargeWithAncilla, ApplyLayout
+
+from benchmarks import SyntheticBackend, benchmark_circuit
+from passes import NoiseAdaptiveSwap
+
+
+class ExhaustiveSwap(NoiseAdaptiveSwap):
+    """NoiseAdaptiveSwap without memoization: every search state gets a new key,
+    so the whole search tree is explored as by the serial exhaustive search."""
+
+    def _search_key(self, layout, iter, last_swap):
+        return object()
+
+
+def physical_dag(backend, circuit):
+    coupling_map = backend.coupling_map
+    layout = PassManager([TrivialLayout(coupling_map), FullAncillaAllocation(coupling_map),
+                          EnlargeWithAncilla(), ApplyLayout()])
+    unrolled = transpile(circuit, basis_gates=['u1', 'u2', 'u3', 'cx', 'id'], optimization_level=0)
+    return circuit_to_dag(layout.run(unrolled))
+
+
+def routed_gates(swap_class, backend, dag, **kwargs):
+    """
+    Returns:
+        list: name and physical qubits of every gate of the routed circuit, in topological order.
+    """
+    swap_pass = swap_class(backend.coupling_map, backend.properties, alpha=0.5, readout=True, **kwargs)
+    new_dag = swap_pass.run(dag)
+    return [(node.name, tuple(q.index for q in node.qargs)) for node in new_dag.topological_op_nodes()]
+
+
+class TestNoiseAdaptiveSwap(unittest.TestCase):
+    """The memoized, beam-limited and parallel searches must route as the exhaustive serial search."""
+
+    def setUp(self):
+        self.cases = [(SyntheticBackend('line-5'), benchmark_circuit('random-5')),
+                      (SyntheticBackend('line-5'), benchmark_circuit('cascade-5')),
+                      (SyntheticBackend('grid-3x3'), benchmark_circuit('random-9'))]
+
+    def assertSameRouting(self, front, **kwargs):
+        for backend, circuit in self.cases:
+            with self.subTest(backend=backend.name, circuit=circuit.name, front=front, **kwargs):
+                dag = physical_dag(backend, circuit)
+                expected = routed_gates(ExhaustiveSwap, backend, dag, search_depth=3, front=front)
+                routed = routed_gates(NoiseAdaptiveSwap, backend, dag, search_depth=3, front=front, **kwargs)
+                self.assertEqual(routed, expected)
+
+    def test_memoized(self):
+        self.assertSameRouting(front=False)
+        self.assertSameRouting(front=True)
+
+    def test_full_beam(self):
+        # n_swaps is 4, so a beam of 4 swaps expands all of them
+        self.assertSameRouting(front=False, beam_width=4)
+        self.assertSameRouting(front=True, beam_width=4)
+
+    def test_workers(self):
+        self.assertSameRouting(front=False, workers=2)
+        self.assertSameRouting(front=True, workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ from qiskit.providers.aer.noise import NoiseModel
 from qiskit.quantum_info import Statevector
 from qiskit.quantum_info.analysis import hellinger_fidelity
 
-from metrics import hog, l1_norm
+from metrics import hog, l1_norm, cx_metrics, ExpectedFidelity
 from pass_manager import noise_pass_manager
 
 qasm_file = 'path/to/qasm/file'
@@ -24,10 +24,19 @@ noise_model = NoiseModel.from_backend(backend)
 
 sim_backend = QasmSimulator(method='statevector', max_parallel_shots=0, max_parallel_threads=0, noise_model=noise_model)
 
+# rank the routing configurations by their expected fidelity, without simulating them
+alphas = [0.0, 0.25, 0.5, 0.75, 1.0]
+compiled = [noise_pass_manager(coupling_map=coupling_map, layout_method='noise_adaptive',
+                               seed_transpiler=1000,
+                               routing_method='noise_adaptive', backend_properties=properties,
+                               alpha=alpha).run(qc) for alpha in alphas]
+expected_fidelities = ExpectedFidelity(properties, decoherence=True).estimates(compiled)
+best_alpha = alphas[int(expected_fidelities.argmax())]
+
 pass_manager = noise_pass_manager(coupling_map=coupling_map, layout_method='noise_adaptive',
                                   seed_transpiler=1000,
                                   routing_method='noise_adaptive', backend_properties=properties,
-                                  alpha=0.5)
+                                  alpha=best_alpha)
 
 ideal_result = execute(qc, backend=StatevectorSimulator()).result()
 ideal_counts = Statevector(ideal_result.get_statevector(qc)).sample_counts(8192)
@@ -41,3 +50,6 @@ sampled_counts = qiskit_na_t_result.get_counts(qc)
 hellinger_fidelity = hellinger_fidelity(ideal_counts, sampled_counts)
 hog = hog(sampled_counts, ideal_probs)
 l1_norm = l1_norm(sampled_counts, ideal_probs)
+
+# cnot count and cnot depth of the compiled circuit, measured in a single pass
+cx_count, cx_depth = cx_metrics(pass_manager.run(qc))